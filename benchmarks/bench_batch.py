@@ -0,0 +1,45 @@
+"""Benchmarks rendering many small snippets one call at a time against markdown_to_html_batch
+
+Run with: PYTHONPATH=src python3 benchmarks/bench_batch.py [snippets] [jobs]
+
+The per-call version builds the wrapping node of every snippet and serializes it with
+to_html, the batch serializes the blocks straight to strings and can fan out over
+worker processes in chunks.
+"""
+import sys
+import time
+
+from corpus import generate_document
+from utils.batch import markdown_to_html_batch
+from utils.convert import markdown_to_html_node
+
+REPEATS = 3
+
+def best_time(func) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    snippets = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    documents = [generate_document("mixed", 300, seed) for seed in range(snippets)]
+    assert list(markdown_to_html_batch(documents[:100])) == [markdown_to_html_node(document).to_html() for document in documents[:100]]
+
+    cases = [
+        ("per call", lambda: [markdown_to_html_node(document).to_html() for document in documents]),
+        ("batch", lambda: list(markdown_to_html_batch(documents))),
+        (f"batch -j{jobs}", lambda: list(markdown_to_html_batch(documents, jobs=jobs))),
+    ]
+    print(f"{snippets} snippets")
+    baseline = None
+    for name, func in cases:
+        elapsed = best_time(func)
+        baseline = baseline or elapsed
+        print(f"{name:<12} {elapsed * 1000:>9.1f} ms {baseline / elapsed:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measures the memory used to build the HTML tree of a large markdown document
+
+Run with: PYTHONPATH=src python3 benchmarks/bench_memory.py [size in MB]
+"""
+import resource
+import sys
+import time
+import tracemalloc
+
+from utils.convert import markdown_to_html_node
+
+PARAGRAPH = (
+    "This is **bold** text with an _italic_ word, some `inline code`, "
+    "a [link](/docs/page) and an ![image](/images/pic.png) in it."
+)
+
+def make_document(size_bytes: int) -> str:
+    blocks = []
+    total = 0
+    index = 0
+    while total < size_bytes:
+        if index % 5 == 0:
+            block = f"## Section {index}"
+        elif index % 5 == 3:
+            block = "\n".join(f"- item {i} with **bold** and a [link](/l/{i})" for i in range(5))
+        else:
+            block = PARAGRAPH
+        blocks.append(block)
+        total += len(block) + 2
+        index += 1
+    return "\n\n".join(blocks)
+
+def count_nodes(node) -> int:
+    return 1 + sum(count_nodes(child) for child in node.children or [])
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    markdown = make_document(int(size_mb * 1024 * 1024))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = markdown_to_html_node(markdown)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(tree)
+    print(f"document:     {len(markdown) / 1024 / 1024:.1f} MB")
+    print(f"html nodes:   {nodes}")
+    print(f"build time:   {elapsed:.2f} s")
+    print(f"tree memory:  {current / 1024 / 1024:.1f} MB ({current / nodes:.0f} bytes/node)")
+    print(f"peak memory:  {peak / 1024 / 1024:.1f} MB")
+    print(f"max rss:      {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmarks the precompiled block and inline patterns against re.* calls with pattern strings
+
+Run with: PYTHONPATH=src python3 benchmarks/bench_regex.py
+
+The uncompiled versions pay for a lookup in re's pattern cache on every call,
+which adds up when the functions run once per block or line.
+"""
+import re
+import time
+
+from corpus import generate_document
+from utils.convert import markdown_to_blocks
+from utils.regex import IMAGE_REGEX, LINK_REGEX, classify_block_start, extract_markdown_images, extract_markdown_links, extract_title
+
+REPEATS = 5
+
+def uncompiled_block_type(block: str) -> tuple[str | None, int]:
+    heading = re.match(r"^#{1,6} [^\n]", block)
+    if heading:
+        return "heading", len(re.match(r"^(#{1,6}\s)", block).group(1)) - 1
+    if re.fullmatch(r"```(.*?)```", block, re.DOTALL):
+        return "code", 0
+    return None, 0
+
+def uncompiled_title(markdown: str) -> str | None:
+    for line in markdown.splitlines():
+        match = re.match(r"^# (.+)", line.strip())
+        if match:
+            return match.group(1)
+    return None
+
+def best_time(func) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    markdown = generate_document("mixed", 500_000)
+    blocks = markdown_to_blocks(markdown)
+    # The title is on the last line, so both versions scan the whole document
+    titled = "\n".join(line.lstrip("#") for line in markdown.splitlines()) + "\n# Title"
+
+    cases = [
+        ("block type", lambda: [uncompiled_block_type(block) for block in blocks], lambda: [classify_block_start(block) for block in blocks]),
+        ("links", lambda: [re.findall(LINK_REGEX, block) + re.findall(IMAGE_REGEX, block) for block in blocks], lambda: [extract_markdown_links(block) + extract_markdown_images(block) for block in blocks]),
+        ("title", lambda: uncompiled_title(titled), lambda: extract_title(titled)),
+    ]
+    print(f"{len(blocks)} blocks")
+    print(f"{'case':<12} {'re.* ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    for name, uncompiled, compiled in cases:
+        before = best_time(uncompiled)
+        after = best_time(compiled)
+        print(f"{name:<12} {before * 1000:>10.2f} {after * 1000:>12.2f} {before / after:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
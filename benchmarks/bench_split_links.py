@@ -0,0 +1,34 @@
+"""Benchmarks split_nodes_link and split_nodes_image on link dense paragraphs
+
+Run with: PYTHONPATH=src python3 benchmarks/bench_split_links.py
+
+The time per match should stay flat as the number of matches grows.
+"""
+import time
+
+from textnode import TextNode, TextType
+from utils.convert import split_nodes_image, split_nodes_link
+
+SIZES = [1_000, 2_500, 5_000, 10_000]
+REPEATS = 5
+
+def link_paragraph(count: int) -> str:
+    return " ".join(f"see [page {i}](/docs/page_{i}) and ![icon {i}](/img/{i}.png)" for i in range(count))
+
+def best_time(func, *args) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    print(f"{'links':>8} {'total ms':>10} {'us/link':>8}")
+    for count in SIZES:
+        text = link_paragraph(count)
+        elapsed = best_time(lambda: split_nodes_link(split_nodes_image([TextNode(text, TextType.TEXT)])))
+        print(f"{count:>8} {elapsed * 1000:>10.2f} {elapsed / count * 1e6:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Generates synthetic markdown corpora for the benchmarks
+
+Every document starts with a "# Title" heading so it can go through generate_page.
+The same seed always produces the same corpus.
+"""
+import os
+import random
+
+SHAPES = ("inline", "links", "code", "lists", "mixed")
+
+WORDS = (
+    "the elves of rivendell kept the old lore of the first age and sang of the "
+    "long defeat while the shadow grew in the east beyond the misty mountains"
+).split()
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def inline_paragraph(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(6, 12)):
+        style = rng.randrange(4)
+        words = _words(rng, rng.randint(1, 4))
+        if style == 0:
+            parts.append(f"**{words}**")
+        elif style == 1:
+            parts.append(f"_{words}_")
+        elif style == 2:
+            parts.append(f"`{words}`")
+        else:
+            parts.append(words)
+        parts.append(_words(rng, rng.randint(2, 6)))
+    return " ".join(parts)
+
+def links_paragraph(rng: random.Random) -> str:
+    parts = []
+    for i in range(rng.randint(20, 40)):
+        if i % 7 == 0:
+            parts.append(f"![{_words(rng, 2)}](/images/{rng.randrange(1000)}.png)")
+        else:
+            parts.append(f"[{_words(rng, 2)}](/reference/{rng.randrange(100000)})")
+        parts.append(_words(rng, rng.randint(1, 3)))
+    return " ".join(parts)
+
+def code_block(rng: random.Random) -> str:
+    lines = [f"    value_{i} = compute({_words(rng, 3)!r})" for i in range(rng.randint(40, 120))]
+    return "```\ndef generated():\n" + "\n".join(lines) + "\n```"
+
+def long_list(rng: random.Random) -> str:
+    count = rng.randint(30, 80)
+    if rng.random() < 0.5:
+        return "\n".join(f"- {_words(rng, 4)} **{_words(rng, 1)}** [ref](/r/{i})" for i in range(count))
+    return "\n".join(f"{i}. {_words(rng, 5)} _{_words(rng, 1)}_" for i in range(1, count + 1))
+
+def quote(rng: random.Random) -> str:
+    return "\n".join(f"> {_words(rng, 8)}" for _ in range(rng.randint(1, 4)))
+
+BLOCKS = {
+    "inline": [inline_paragraph],
+    "links": [links_paragraph],
+    "code": [code_block, inline_paragraph],
+    "lists": [long_list],
+    "mixed": [inline_paragraph, links_paragraph, code_block, long_list, quote],
+}
+
+def generate_document(shape: str, size_bytes: int, seed: int = 0) -> str:
+    """Generates one markdown document of roughly the given size
+
+    Args:
+        shape (str): One of SHAPES
+        size_bytes (int): The approximate size of the document
+        seed (int): The random seed
+
+    Returns:
+        str: The markdown document
+    """
+    if shape not in BLOCKS:
+        raise Exception(f"Invalid corpus shape received: {shape}")
+
+    rng = random.Random(f"{shape}-{seed}")
+    blocks = [f"# {_words(rng, 4).title()}"]
+    total = len(blocks[0])
+    while total < size_bytes:
+        if rng.random() < 0.1:
+            block = f"## {_words(rng, 3).title()}"
+        else:
+            block = rng.choice(BLOCKS[shape])(rng)
+        blocks.append(block)
+        total += len(block) + 2
+    return "\n\n".join(blocks)
+
+def write_corpus(directory: str, files: int, shape: str, size_bytes: int, seed: int = 0, per_dir: int = 100) -> list[str]:
+    """Writes a tree of markdown documents
+
+    Args:
+        directory (str): The content directory to be written
+        files (int): The number of documents
+        shape (str): One of SHAPES
+        size_bytes (int): The approximate size of each document
+        seed (int): The random seed
+        per_dir (int): The number of documents in each sub directory
+
+    Returns:
+        list[str]: The paths of the written documents
+    """
+    paths = []
+    for i in range(files):
+        sub_dir = os.path.join(directory, f"section{i // per_dir}")
+        os.makedirs(sub_dir, exist_ok=True)
+        path = os.path.join(sub_dir, f"page{i}.md")
+        with open(path, "w") as f:
+            f.write(generate_document(shape, size_bytes, seed + i))
+        paths.append(path)
+    return paths
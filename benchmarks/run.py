@@ -0,0 +1,206 @@
+"""Benchmark harness for the markdown to HTML pipeline
+
+Run with: ./bench.sh [options], or PYTHONPATH=src python3 benchmarks/run.py [options]
+
+Each pipeline stage is timed on its own for every corpus shape, then
+generate_pages_recursive is timed end to end over a tree of files. Results are
+written as JSON. Passing --compare with an earlier result file reports every
+benchmark that got slower by more than --threshold, and exits non-zero if any did.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from corpus import SHAPES, generate_document, write_corpus
+from utils.convert import (
+    BlockType,
+    block_to_block_type,
+    block_to_html_node,
+    get_text_from_block,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_to_textnodes,
+)
+from utils.site_gen import generate_page, generate_pages_recursive
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(PROJECT_DIR, "template.html")
+
+def time_call(func, repeats: int, setup=None) -> dict:
+    """Times a function, keeping the best and mean of several runs
+
+    Args:
+        func: The function to be timed, called without arguments
+        repeats (int): The number of runs
+        setup: Optional function called without arguments before each run, not timed
+
+    Returns:
+        dict: The best and mean wall time in seconds
+    """
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "mean": sum(times) / len(times), "repeats": repeats}
+
+def bench_stages(shape: str, size_bytes: int, repeats: int) -> dict:
+    """Times each pipeline stage on one document
+
+    Args:
+        shape (str): The corpus shape
+        size_bytes (int): The document size
+        repeats (int): The number of runs per stage
+
+    Returns:
+        dict: The timings keyed by stage name
+    """
+    markdown = generate_document(shape, size_bytes)
+    blocks = markdown_to_blocks(markdown)
+    typed_blocks = [(block, block_to_block_type(block)) for block in blocks]
+    inline_texts = [
+        get_text_from_block(block, block_type)
+        for block, block_type in typed_blocks
+        if block_type != BlockType.CODE
+    ]
+    tree = markdown_to_html_node(markdown)
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench-page-")
+    try:
+        source = os.path.join(tmp_dir, "page.md")
+        with open(source, "w") as f:
+            f.write(markdown)
+        dest = os.path.join(tmp_dir, "out", "page.html")
+
+        def run_generate_page():
+            with redirect_stdout(io.StringIO()):
+                generate_page(source, TEMPLATE_PATH, dest, "/")
+
+        return {
+            "markdown_to_blocks": time_call(lambda: markdown_to_blocks(markdown), repeats),
+            "block_to_block_type": time_call(lambda: [block_to_block_type(block) for block in blocks], repeats),
+            "text_to_textnodes": time_call(lambda: [text_to_textnodes(text) for text in inline_texts], repeats),
+            "block_to_html_node": time_call(lambda: [block_to_html_node(block, block_type) for block, block_type in typed_blocks], repeats),
+            # The tree keeps the HTML it returned, every run has to serialize it again
+            "to_html": time_call(tree.to_html, repeats, setup=tree.clear_cached_html),
+            "generate_page": time_call(run_generate_page, repeats),
+        }
+    finally:
+        shutil.rmtree(tmp_dir)
+
+def bench_site(shape: str, files: int, size_bytes: int, repeats: int) -> dict:
+    """Times generate_pages_recursive over a tree of documents
+
+    Args:
+        shape (str): The corpus shape
+        files (int): The number of documents
+        size_bytes (int): The size of each document
+        repeats (int): The number of runs
+
+    Returns:
+        dict: The timing of the full site build
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="bench-site-")
+    try:
+        content = os.path.join(tmp_dir, "content")
+        write_corpus(content, files, shape, size_bytes)
+        dest = os.path.join(tmp_dir, "docs")
+
+        def run_site():
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, TEMPLATE_PATH, dest, "/")
+
+        return time_call(run_site, repeats)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Finds the benchmarks that got slower than the baseline
+
+    Args:
+        results (dict): The current results
+        baseline (dict): Earlier results from the same harness
+        threshold (float): The allowed slowdown (ex: 0.1 for 10%)
+
+    Returns:
+        list[str]: A description of every regression
+    """
+    regressions = []
+    for name, timing in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None or previous["best"] <= 0:
+            continue
+        change = timing["best"] / previous["best"] - 1
+        if change > threshold:
+            regressions.append(f"{name}: {previous['best'] * 1000:.2f} ms -> {timing['best'] * 1000:.2f} ms ({change:+.0%})")
+    return regressions
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks the markdown to HTML pipeline")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES), help="The corpus shapes to benchmark")
+    parser.add_argument("--size", type=int, default=200_000, help="The size in bytes of the document used for the stage benchmarks")
+    parser.add_argument("--files", type=int, default=200, help="The number of files in the end to end site benchmark")
+    parser.add_argument("--file-size", type=int, default=5_000, help="The size in bytes of each file in the site benchmark")
+    parser.add_argument("--repeats", type=int, default=5, help="The number of runs per benchmark, the best is reported")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="An earlier JSON result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="The slowdown reported as a regression")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv[1:])
+    benchmarks = {}
+    for shape in args.shapes:
+        for stage, timing in bench_stages(shape, args.size, args.repeats).items():
+            benchmarks[f"{shape}/{stage}"] = timing
+        benchmarks[f"{shape}/generate_pages_recursive"] = bench_site(shape, args.files, args.file_size, args.repeats)
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "params": {
+            "size": args.size,
+            "files": args.files,
+            "file_size": args.file_size,
+            "repeats": args.repeats,
+        },
+        "benchmarks": benchmarks,
+    }
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"Regression {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+from utils.daemon_client import send_request
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOCKET_PATH = os.path.join(PROJECT_DIR, ".build_daemon.sock")
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parses the command line arguments for a build requested from the daemon
+
+    Args:
+        argv (list[str]): The command line arguments (without the program name)
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Asks the build daemon (main.py daemon) to build the site")
+    parser.add_argument("basepath", nargs="?", default="/", help="The root path the site is hosted under")
+    parser.add_argument("--full", action="store_true", help="Render every page instead of only the changed ones")
+    parser.add_argument("--stop", action="store_true", help="Stop the daemon instead of building")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="The Unix socket the daemon listens on")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.stop:
+        request = {"command": "stop"}
+    else:
+        request = {"command": "build", "basepath": args.basepath, "incremental": not args.full}
+
+    try:
+        status = send_request(args.socket, request)
+    except Exception as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    print(status.get("message", ""))
+    sys.exit(0 if status.get("status") == "ok" else 1)
+
+if __name__ == "__main__":
+    main()
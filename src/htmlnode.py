@@ -1,4 +1,40 @@
+from typing import Callable
+
+# Bumped by every change to a node after it was created. A node does not know its
+# parents, so a change anywhere invalidates the serialized HTML cached by every node.
+_generation = 0
+
+def _node_changed():
+    global _generation
+    _generation += 1
+
+def _invalidating(method):
+    def changed(self, *args, **kwargs):
+        _node_changed()
+        return method(self, *args, **kwargs)
+    return changed
+
+
+class NodeList(list):
+    """The children of a node, invalidating cached HTML when changed in place"""
+    __slots__ = ()
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(NodeList, _name, _invalidating(getattr(list, _name)))
+
+
+class NodeProps(dict):
+    """The props of a node, invalidating cached HTML when changed in place"""
+    __slots__ = ()
+
+for _name in ("__setitem__", "__delitem__", "__ior__", "clear", "pop", "popitem", "setdefault", "update"):
+    setattr(NodeProps, _name, _invalidating(getattr(dict, _name)))
+
+
 class HTMLNode:
+    # Slots keep nodes free of a per-instance __dict__, a large site builds millions of them
+    __slots__ = ("_tag", "_value", "_children", "_props")
+
     def __init__(
         self,
         tag: str = None,
@@ -6,17 +42,95 @@ class HTMLNode:
         children: list = None,
         props: dict = None,
     ):
-        self.tag = tag
-        self.value = value
-        self.children = children
-        self.props = props
+        self._tag = tag
+        self._value = value
+        self._children = NodeList(children) if children is not None else None
+        self._props = NodeProps(props) if props is not None else None
+
+    @property
+    def tag(self) -> str:
+        return self._tag
+
+    @tag.setter
+    def tag(self, tag: str):
+        self._tag = tag
+        _node_changed()
+
+    @property
+    def value(self) -> str:
+        return self._value
+
+    @value.setter
+    def value(self, value: str):
+        self._value = value
+        _node_changed()
+
+    @property
+    def children(self) -> list:
+        return self._children
+
+    @children.setter
+    def children(self, children: list):
+        self._children = NodeList(children) if children is not None else None
+        _node_changed()
+
+    @property
+    def props(self) -> dict:
+        return self._props
+
+    @props.setter
+    def props(self, props: dict):
+        self._props = NodeProps(props) if props is not None else None
+        _node_changed()
 
     def to_html(self):
+        try:
+            parts = []
+            self.append_html(parts)
+        except ValueError as e:
+            return e
+        return "".join(parts)
+
+    def append_html(self, parts: list[str]):
+        """Appends the serialized HTML of the node to a list buffer
+
+        Args:
+            parts (list[str]): The buffer the HTML pieces are appended to
+
+        Raises:
+            ValueError: The node or one of its children is invalid
+        """
         raise NotImplementedError
 
+    def iter_html(self):
+        """Yields the serialized HTML of the node in pieces
+
+        Yields:
+            str: The next piece of HTML
+
+        Raises:
+            ValueError: The node or one of its children is invalid
+        """
+        parts = []
+        self.append_html(parts)
+        yield "".join(parts)
+
+    def write_html(self, fp):
+        """Streams the serialized HTML of the node to a writable file-like object
+
+        Args:
+            fp: The file-like object the HTML is written to
+
+        Raises:
+            ValueError: The node or one of its children is invalid. HTML for the
+                children before it has already been written.
+        """
+        for chunk in self.iter_html():
+            fp.write(chunk)
+
     def props_to_html(self):
-        if self.props:
-            return " " + " ".join(f'{k}="{v}"' for k, v in self.props.items())
+        if self._props:
+            return " " + " ".join(f'{k}="{v}"' for k, v in self._props.items())
         return ""
 
     def __repr__(self):
@@ -24,44 +138,143 @@ class HTMLNode:
         -- HTML Node -- 
         Tag: {self.tag}
         Value: {self.value}
-        Children: {self.children}
+        Children: {self._children}
         props: {self.props_to_html()}
         """
         return string
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props:dict=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
-        if self.value is None:
-            return ValueError("LeafNode with no value")
-
-        if self.tag is None:
-            return self.value
+    def append_html(self, parts: list[str]):
+        if self._value is None:
+            raise ValueError("LeafNode with no value")
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        if self._tag is None:
+            parts.append(self._value)
+        else:
+            parts.append(f"<{self._tag}{self.props_to_html()}>{self._value}</{self._tag}>")
 
 
 class ParentNode(HTMLNode):
+    """A node holding other nodes
+
+    The HTML returned by to_html is kept on the node and returned again until any node
+    changes. Only the node to_html is called on keeps its HTML, so a serialized tree
+    holds one copy of it. The children and props given are copied into a NodeList and
+    NodeProps, which invalidate the HTML when changed in place, so change them through
+    the node's children and props rather than the list and dict that were passed in.
+    """
+    # Leaves make up most of a tree, so only parents pay for the lazy children and the cache
+    __slots__ = ("_make_children", "_html")
+
     def __init__(self, tag: str, children: list, props: dict=None):
         super().__init__(tag, None, children, props)
+        self._make_children = None
+        self._html = None
+
+    @classmethod
+    def lazy(cls, tag: str, make_children: Callable[[], list], props: dict = None) -> "ParentNode":
+        """Creates a node whose children are only created when they are first needed
+
+        Args:
+            tag (str): The tag of the node
+            make_children (Callable[[], list]): Creates the children of the node, called
+                at most once when the children are accessed or serialized
+            props (dict): The props of the node
+
+        Returns:
+            ParentNode: The node
+        """
+        node = cls(tag, None, props)
+        node._make_children = make_children
+        return node
+
+    @property
+    def children(self) -> list:
+        # Lazy children are created the first time they are needed, a failed attempt is retried
+        if self._make_children is not None:
+            self._children = NodeList(self._make_children())
+            self._make_children = None
+        return self._children
+
+    @children.setter
+    def children(self, children: list):
+        self._make_children = None
+        self._children = NodeList(children) if children is not None else None
+        _node_changed()
+
+    def is_materialized(self) -> bool:
+        """Checks if the children of the node have been created
+
+        Returns:
+            bool: False while the children of a lazy node have not been needed yet
+        """
+        return self._make_children is None
+
+    def cached_html(self) -> str | None:
+        """Gets the HTML to_html last returned for the node, if no node changed since
+
+        Returns:
+            str | None: The serialized HTML, or None if it has to be serialized again
+        """
+        if self._html is not None and self._html[0] == _generation:
+            return self._html[1]
+        return None
+
+    def clear_cached_html(self):
+        """Forgets the HTML kept by to_html, so the next call serializes the tree again"""
+        self._html = None
 
     def to_html(self):
-        if not self.tag:
-            return ValueError("ParentNode with no tag")
+        html = self.cached_html()
+        if html is not None:
+            return html
+        # Taken before serializing, lazy children created on the way do not change the HTML
+        generation = _generation
+        html = super().to_html()
+        if isinstance(html, str):
+            self._html = (generation, html)
+        return html
+
+    def validate(self):
+        """Checks the node can be serialized
+
+        Raises:
+            ValueError: The node has no tag or no children
+        """
+        if not self._tag:
+            raise ValueError("ParentNode with no tag")
 
         if not self.children:
-            return ValueError("ParentNode missing children")
-
-        results = ""
-        for child in self.children:
-            result = child.to_html()
-            if not isinstance(
-                result, ValueError
-            ):
-                results += result
-            else:
-                return ValueError(str(result))
-        return f"<{self.tag}>{results}</{self.tag}>"
+            raise ValueError("ParentNode missing children")
+
+    def append_html(self, parts: list[str]):
+        html = self.cached_html()
+        if html is not None:
+            parts.append(html)
+            return
+
+        self.validate()
+        parts.append(f"<{self._tag}>")
+        for child in self._children:
+            child.append_html(parts)
+        parts.append(f"</{self._tag}>")
+
+    def iter_html(self):
+        # Yields one piece per child so streaming a page only holds one block at a time
+        html = self.cached_html()
+        if html is not None:
+            yield html
+            return
+        self.validate()
+        yield f"<{self._tag}>"
+        for child in self._children:
+            parts = []
+            child.append_html(parts)
+            yield "".join(parts)
+        yield f"</{self._tag}>"
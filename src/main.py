@@ -1,22 +1,179 @@
+import argparse
 import os
 import sys
-from utils.site_gen import generate_public, generate_pages_recursive
+import time
+from utils.async_build import generate_pages_async
+from utils.context import BuildContext
+from utils.daemon import BuildDaemon
+from utils.discovery import DirectoryIndex
+from utils.manifest import BuildManifest
+from utils.profiling import BuildProfiler, set_active_profiler
+from utils.render_cache import RenderCache
+from utils.site_gen import generate_public, generate_pages_recursive, generate_pages_parallel
+from utils.sync import LINK_MODES
+from utils.watch import SiteWatcher, start_server
 
-def main():
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    else:
-        basepath = "/"
-    if generate_public():
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTENT_PATH = os.path.join(PROJECT_DIR, "content")
+STATIC_PATH = os.path.join(PROJECT_DIR, "static")
+TEMPLATE_PATH = os.path.join(PROJECT_DIR, "template.html")
+DOCS_PATH = os.path.join(PROJECT_DIR, "docs")
+MANIFEST_PATH = os.path.join(PROJECT_DIR, ".build_manifest.json")
+INDEX_PATH = os.path.join(PROJECT_DIR, ".content_index.json")
+SOCKET_PATH = os.path.join(PROJECT_DIR, ".build_daemon.sock")
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parses the command line arguments for a build
+
+    Args:
+        argv (list[str]): The command line arguments (without the program name)
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Generates the static site from the content directory")
+    parser.add_argument("basepath", nargs="?", default="/", help="The root path the site is hosted under")
+    parser.add_argument("--incremental", action="store_true", help="Only render pages that changed since the last build")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="The number of worker processes used to render pages")
+    parser.add_argument("--cache-dir", help="Directory for the on-disk cache of rendered markdown blocks")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Overlap reading and writing pages with rendering (--jobs sets the render processes)")
+    parser.add_argument("--io-concurrency", type=int, default=8, help="The number of pages read and written at the same time with --async")
+    parser.add_argument("--verify-hash", action="store_true", help="Compare static file contents, not just size and mtime")
+    parser.add_argument("--link", choices=LINK_MODES, default="copy", help="How static files are placed in docs")
+    parser.add_argument("--profile", action="store_true", help="Print the time spent in each pipeline stage and the slowest pages")
+    parser.add_argument("--profile-top", type=int, default=10, help="The number of slowest pages in the profile")
+    parser.add_argument("--trace", help="Write a Chrome trace event JSON file of the build (implies --profile)")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+def parse_serve_args(argv: list[str]) -> argparse.Namespace:
+    """Parses the command line arguments for the dev server
+
+    Args:
+        argv (list[str]): The command line arguments after "serve"
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Builds the site and serves it locally")
+    parser.add_argument("basepath", nargs="?", default="/", help="The root path the site is hosted under")
+    parser.add_argument("--watch", action="store_true", help="Rebuild changed pages and static files while serving")
+    parser.add_argument("--port", type=int, default=8888, help="The port to serve on")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between checks for changes")
+    parser.add_argument("--cache-dir", help="Directory for the on-disk cache of rendered markdown blocks")
+    return parser.parse_args(argv)
+
+def parse_daemon_args(argv: list[str]) -> argparse.Namespace:
+    """Parses the command line arguments for the build daemon
+
+    Args:
+        argv (list[str]): The command line arguments after "daemon"
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(prog="main.py daemon", description="Keeps the builder loaded and builds the site on request")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="The Unix socket to accept build requests on")
+    parser.add_argument("--cache-dir", help="Directory for the on-disk cache of rendered markdown blocks")
+    return parser.parse_args(argv)
+
+def build(args: argparse.Namespace):
+    """Builds the site into docs
+
+    Args:
+        args (argparse.Namespace): The parsed build arguments
+    """
+    basepath = args.basepath
+    # Full builds start from an empty manifest so it always matches what is in docs
+    manifest = BuildManifest.load(MANIFEST_PATH) if args.incremental else BuildManifest(MANIFEST_PATH)
+    cache = RenderCache(args.cache_dir) if args.cache_dir else None
+    index = DirectoryIndex.load(INDEX_PATH)
+    context = BuildContext(CONTENT_PATH, TEMPLATE_PATH, DOCS_PATH, basepath, manifest, cache, index)
+
+    pages = {dest for _, dest in context.pages()}
+    # Full builds compare static files by size and mtime, recording them in the graph would hash every one
+    graph = manifest.graph if args.incremental else None
+    if generate_public(keep=pages, verify_hash=args.verify_hash, link_mode=args.link, graph=graph):
         print("Successfully generated public")
     else:
         print("Failed to generate public")
-    main_dir = os.path.dirname(os.path.abspath(__file__))
-    project_dir = os.path.dirname(main_dir)
-    markdown_path = os.path.join(project_dir, "content")
-    template_path = os.path.join(project_dir, "template.html")
-    index_path = os.path.join(project_dir, "docs")
-    generate_pages_recursive(markdown_path, template_path, index_path, basepath)
-    
+
+    profiler = BuildProfiler() if args.profile or args.trace else None
+    set_active_profiler(profiler)
+    try:
+        if args.use_async:
+            render_jobs = args.jobs if args.jobs > 1 else 0
+            generate_pages_async(
+                CONTENT_PATH, TEMPLATE_PATH, DOCS_PATH, basepath, manifest, cache,
+                readers=args.io_concurrency, writers=args.io_concurrency, render_jobs=render_jobs, index=index,
+            )
+        elif args.jobs > 1:
+            generate_pages_parallel(CONTENT_PATH, TEMPLATE_PATH, DOCS_PATH, basepath, args.jobs, manifest, cache=cache, index=index)
+        else:
+            generate_pages_recursive(CONTENT_PATH, TEMPLATE_PATH, DOCS_PATH, basepath, context=context)
+    finally:
+        set_active_profiler(None)
+    for path in manifest.prune():
+        print(f"Removed stale page {path}")
+    manifest.save()
+    index.save()
+
+    if profiler is not None:
+        print(profiler.summary(args.profile_top))
+        if args.trace:
+            profiler.write_trace(args.trace)
+            print(f"Wrote trace to {args.trace}")
+
+def serve(args: argparse.Namespace):
+    """Builds the site into docs and serves it, rebuilding on changes when watching
+
+    Args:
+        args (argparse.Namespace): The parsed serve arguments
+    """
+    cache = RenderCache(args.cache_dir) if args.cache_dir else None
+    watcher = SiteWatcher(CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH, DOCS_PATH, args.basepath, cache)
+    watcher.build()
+    # Pages rebuilt while watching are not recorded, so the next incremental build starts over
+    BuildManifest(MANIFEST_PATH).save()
+
+    server = start_server(DOCS_PATH, args.port)
+    print(f"Serving {DOCS_PATH} at http://localhost:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(args.interval)
+            if not args.watch:
+                continue
+            for path in watcher.poll():
+                print(f"Updated {os.path.relpath(path, DOCS_PATH)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+def daemon(args: argparse.Namespace):
+    """Runs the build daemon until it is stopped
+
+    Args:
+        args (argparse.Namespace): The parsed daemon arguments
+    """
+    cache = RenderCache(args.cache_dir) if args.cache_dir else None
+    build_daemon = BuildDaemon(args.socket, CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH, DOCS_PATH, MANIFEST_PATH, cache)
+    print(f"Build daemon listening on {args.socket}")
+    try:
+        build_daemon.serve()
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    argv = sys.argv[1:]
+    if argv and argv[0] == "serve":
+        serve(parse_serve_args(argv[1:]))
+    elif argv and argv[0] == "daemon":
+        daemon(parse_daemon_args(argv[1:]))
+    else:
+        build(parse_args(argv))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.discovery import DirectoryIndex
+from utils.manifest import BuildManifest
+from utils.profiling import active_profiler
+from utils.render_cache import RenderCache
+from utils.site_gen import STREAM_THRESHOLD_BYTES, collect_pages, generate_page, init_worker, render_markdown_page, worker_cache
+
+def _render_job(job: tuple[str, str, str, str]) -> tuple[str, dict | None]:
+    """Render process entry point that renders one page
+
+    Args:
+        job (tuple[str, str, str, str]): The source path, markdown, template path and basepath
+
+    Returns:
+        tuple[str, dict | None]: The page html, and the profile of the page when profiling
+    """
+    source, markdown_contents, template_path, basepath = job
+    profiler = active_profiler()
+    if profiler is None:
+        return render_markdown_page(markdown_contents, template_path, basepath, worker_cache()), None
+
+    with profiler.page(source):
+        text = render_markdown_page(markdown_contents, template_path, basepath, worker_cache())
+    return text, profiler.export()
+
+def _read_page(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+def _write_page(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+async def build_pages_async(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str, manifest: BuildManifest = None, cache: RenderCache = None, readers: int = 8, writers: int = 8, render_jobs: int = 0, queue_size: int = 16, index: DirectoryIndex = None):
+    """Generates all html pages in the content with reads and writes overlapping rendering
+
+    Reader tasks read pages in threads and feed a bounded queue of markdown to the
+    renderers, which feed a bounded queue of html to the writer tasks. While a page
+    renders, the next pages are being read and the previous ones written, so slow
+    storage (such as a network mounted content directory) does not stall each page.
+
+    Args:
+        dir_path_content (str): The directory path to the markdown content to be converted
+        template_path (str): The path to the template index file
+        dest_dir_path (str): The directory for the converted html files
+        basepath (str): The root path the site is hosted under
+        manifest (BuildManifest): Build manifest for incremental builds
+        cache (RenderCache): Optional cache of rendered markdown blocks
+        readers (int): The number of pages read at the same time
+        writers (int): The number of pages written at the same time
+        render_jobs (int): The number of worker processes rendering pages, 0 renders
+            in the event loop's thread
+        queue_size (int): The number of pages each queue holds before its producers wait
+        index (DirectoryIndex): Optional index of the directories listed by earlier builds
+
+    Raises:
+        Exception: A page failed to generate
+    """
+    if readers < 1 or writers < 1 or queue_size < 1:
+        raise Exception("Readers, writers and queue size must be at least 1")
+
+    loop = asyncio.get_running_loop()
+    profiler = active_profiler()
+    pending = iter(collect_pages(dir_path_content, dest_dir_path, index))
+    render_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    if manifest is not None:
+        # The changed inputs are hashed once before any page is recorded, so the manifest is
+        # only read and written from the event loop's thread while the pipeline runs
+        manifest.graph.stale_outputs()
+
+    executor = None
+    if render_jobs > 0:
+        executor = ProcessPoolExecutor(max_workers=render_jobs, initializer=init_worker, initargs=(cache, profiler is not None))
+
+    def record(source: str, dest: str):
+        if manifest is not None:
+            manifest.record(source, template_path, dest, basepath)
+
+    async def read_pages():
+        # The readers share one iterator, so every page is taken by exactly one of them
+        for source, dest in pending:
+            if manifest is not None and manifest.is_fresh(source, template_path, dest, basepath):
+                continue
+            if os.path.getsize(source) >= STREAM_THRESHOLD_BYTES:
+                # Large pages are streamed by generate_page rather than held in the queues. The
+                # profiler times one page at a time, so profiled pages stay on the loop's thread.
+                if profiler is not None:
+                    generate_page(source, template_path, dest, basepath, cache)
+                else:
+                    await asyncio.to_thread(generate_page, source, template_path, dest, basepath, cache)
+                record(source, dest)
+                continue
+            markdown_contents = await asyncio.to_thread(_read_page, source)
+            await render_queue.put((source, dest, markdown_contents))
+
+    async def render_pages():
+        while (item := await render_queue.get()) is not None:
+            source, dest, markdown_contents = item
+            print(f"Generating page from {source} to {dest} using {template_path}")
+            try:
+                if executor is not None:
+                    text, profile = await loop.run_in_executor(executor, _render_job, (source, markdown_contents, template_path, basepath))
+                    if profile is not None:
+                        profiler.merge(profile)
+                elif profiler is not None:
+                    with profiler.page(source):
+                        text = render_markdown_page(markdown_contents, template_path, basepath, cache)
+                else:
+                    text = render_markdown_page(markdown_contents, template_path, basepath, cache)
+            except Exception as e:
+                raise Exception(f"Failed to generate page {source}: {e}") from e
+            await write_queue.put((source, dest, text))
+
+    async def write_pages():
+        while (item := await write_queue.get()) is not None:
+            source, dest, text = item
+            await asyncio.to_thread(_write_page, dest, text)
+            record(source, dest)
+
+    async def close_after(tasks: list[asyncio.Task], queue: asyncio.Queue, consumers: int):
+        await asyncio.gather(*tasks)
+        for _ in range(consumers):
+            await queue.put(None)
+
+    renderers = max(1, render_jobs)
+    try:
+        async with asyncio.TaskGroup() as group:
+            reader_tasks = [group.create_task(read_pages()) for _ in range(readers)]
+            render_tasks = [group.create_task(render_pages()) for _ in range(renderers)]
+            for _ in range(writers):
+                group.create_task(write_pages())
+            group.create_task(close_after(reader_tasks, render_queue, renderers))
+            group.create_task(close_after(render_tasks, write_queue, writers))
+    except ExceptionGroup as e:
+        raise e.exceptions[0]
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def generate_pages_async(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str, manifest: BuildManifest = None, cache: RenderCache = None, readers: int = 8, writers: int = 8, render_jobs: int = 0, queue_size: int = 16, index: DirectoryIndex = None):
+    """Generates all html pages in the content with the asyncio pipeline of build_pages_async
+
+    Args:
+        dir_path_content (str): The directory path to the markdown content to be converted
+        template_path (str): The path to the template index file
+        dest_dir_path (str): The directory for the converted html files
+        basepath (str): The root path the site is hosted under
+        manifest (BuildManifest): Build manifest for incremental builds
+        cache (RenderCache): Optional cache of rendered markdown blocks
+        readers (int): The number of pages read at the same time
+        writers (int): The number of pages written at the same time
+        render_jobs (int): The number of worker processes rendering pages, 0 renders
+            in the event loop's thread
+        queue_size (int): The number of pages each queue holds before its producers wait
+        index (DirectoryIndex): Optional index of the directories listed by earlier builds
+
+    Raises:
+        Exception: A page failed to generate
+    """
+    asyncio.run(build_pages_async(
+        dir_path_content, template_path, dest_dir_path, basepath, manifest, cache,
+        readers, writers, render_jobs, queue_size, index,
+    ))
@@ -0,0 +1,101 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
+from utils.convert import markdown_to_html
+from utils.render_cache import RenderCache
+from utils.site_gen import init_worker, worker_cache
+
+# Small documents render in well under a millisecond, so each worker is sent many at a
+# time to spread the cost of pickling them to and from the process
+DEFAULT_CHUNKSIZE = 64
+
+def _render_document(document: str | os.PathLike, position: int, cache: RenderCache, basepath: str) -> str:
+    """Renders one document of a batch, naming the document if it fails
+
+    Args:
+        document (str | os.PathLike): The markdown, or the path of a markdown file
+        position (int): The position of the document in the batch
+        cache (RenderCache): Optional cache of rendered blocks
+        basepath (str): The root path link and image urls are resolved against
+
+    Raises:
+        Exception: The document failed to render
+
+    Returns:
+        str: The HTML of the document
+    """
+    try:
+        if isinstance(document, str):
+            return markdown_to_html(document, cache, basepath)
+        with open(document, "r") as f:
+            return markdown_to_html(f.read(), cache, basepath)
+    except Exception as e:
+        name = f"{position} ({os.fspath(document)})" if not isinstance(document, str) else position
+        raise Exception(f"Failed to render document {name}: {e}") from e
+
+def _render_chunk(job: tuple[int, list, str]) -> list[str]:
+    """Worker entry point that renders a chunk of documents
+
+    Args:
+        job (tuple[int, list, str]): The position of the chunk's first document, the
+            documents and the basepath
+
+    Returns:
+        list[str]: The HTML of each document
+    """
+    start, documents, basepath = job
+    return [
+        _render_document(document, start + offset, worker_cache(), basepath)
+        for offset, document in enumerate(documents)
+    ]
+
+def markdown_to_html_batch(documents: Iterable[str | os.PathLike], cache: RenderCache = None, basepath: str = "/", jobs: int = 1, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[str]:
+    """Converts many markdown documents to HTML strings
+
+    Every document shares the compiled patterns, the cache and the worker processes,
+    instead of paying for them on each call. Strings are markdown, path-like objects
+    (ex: pathlib.Path) are files that are read by the process rendering them.
+
+    Args:
+        documents (Iterable[str | os.PathLike]): The markdown documents, or paths to them
+        cache (RenderCache): Optional cache of rendered blocks, shared by the whole batch.
+            Each worker process gets its own memory tier and shares the disk tier.
+        basepath (str): The root path link and image urls are resolved against
+        jobs (int): The number of worker processes, 1 renders in this process
+        chunksize (int): The number of documents sent to a worker at a time
+
+    Raises:
+        Exception: A document failed to render. Its position in the batch is reported.
+
+    Yields:
+        str: The HTML of each document, in the order of the documents
+    """
+    if jobs < 1 or chunksize < 1:
+        raise Exception("Jobs and chunk size must be at least 1")
+
+    if jobs == 1:
+        for position, document in enumerate(documents):
+            yield _render_document(document, position, cache, basepath)
+        return
+
+    documents = iter(documents)
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache,))
+    try:
+        pending = deque()
+        start = 0
+        while True:
+            # A few chunks per worker are in flight, so a long iterable is not read all at once
+            while len(pending) < jobs * 2:
+                chunk = list(islice(documents, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_render_chunk, (start, chunk, basepath)))
+                start += len(chunk)
+            if not pending:
+                break
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,46 @@
+from utils.discovery import DirectoryIndex, find_markdown_files, page_dest_path
+from utils.manifest import BuildManifest
+from utils.render_cache import RenderCache
+from utils.template import Template, load_template
+
+class BuildContext:
+    """The settings and shared state of one build, created once and passed to every page
+
+    The template is read, compiled and pointed at the basepath once for the whole
+    build, so the work left for each page is its own content.
+    """
+
+    def __init__(self, content_dir: str, template_path: str, dest_dir: str, basepath: str = "/", manifest: BuildManifest = None, cache: RenderCache = None, index: DirectoryIndex = None):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest = manifest
+        self.cache = cache
+        self.index = index
+        if manifest is not None:
+            # Recorded as it was when loaded, an edit later in the build renders every page again next time
+            manifest.graph.snapshot(template_path)
+        self.template: Template = load_template(template_path, basepath)
+        self._pages = None
+
+    def pages(self) -> list[tuple[str, str]]:
+        """Lists every markdown page in the content with its html destination, discovered once per build
+
+        Returns:
+            list[tuple[str, str]]: The (source, destination) path pairs, sorted by source
+        """
+        if self._pages is None:
+            self._pages = [(source, self.dest_path(source)) for source in find_markdown_files(self.content_dir, self.index)]
+        return list(self._pages)
+
+    def dest_path(self, source: str) -> str:
+        """Maps a markdown page in the content directory to its html file
+
+        Args:
+            source (str): The markdown file path
+
+        Returns:
+            str: The html file path in the destination directory
+        """
+        return page_dest_path(source, self.content_dir, self.dest_dir)
@@ -1,7 +1,22 @@
+import codecs
+import locale
+import mmap
+import os
+import re
 from enum import Enum
+from functools import partial
+from typing import Callable, Iterable, Iterator
 from htmlnode import LeafNode, HTMLNode, ParentNode
 from textnode import TextNode, TextType
-from utils.regex import extract_markdown_links, extract_markdown_images, is_block_heading, is_block_code, get_heading, remove_ordered_list_prefix
+from utils.profiling import count_spans, stage
+from utils.render_cache import RenderCache, make_key
+from utils.regex import HEADING, CODE, iter_markdown_links, iter_markdown_images, classify_block_start, get_heading, remove_ordered_list_prefix
+
+# Bump whenever the HTML produced for a block changes so cached fragments are not reused
+CONVERTER_VERSION = "2"
+CODE_FENCE = "```"
+# "\n\n" can only be found at character boundaries in UTF-8 bytes, so blocks can be split before decoding
+_DEFAULT_ENCODING_IS_UTF8 = codecs.lookup(locale.getpreferredencoding(False)).name == "utf-8"
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -11,11 +26,27 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def resolve_url(url: str, basepath: str = "/") -> str:
+    """Points a root relative url at the root path the site is hosted under
+
+    Args:
+        url (str): The url of a link or image
+        basepath (str): The root path the site is hosted under
+
+    Returns:
+        str: The url under the basepath (ex: "/blog" --> "/site/blog"), other urls unchanged
+    """
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+def text_node_to_html_node(text_node: TextNode, basepath: str = "/") -> LeafNode:
     """Converts a text node object into a LeafNode object
 
     Args:
         text_node (TextNode): The TextNode to convert
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it with resolve_url
 
     Raises:
         Exception: Invalid text type received for given TextNode
@@ -36,9 +67,9 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, props={"href": text_node.url})
+            return LeafNode("a", text_node.text, props={"href": resolve_url(text_node.url, basepath)})
         case TextType.IMAGE: 
-            return LeafNode("img", "", props={"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", props={"src": resolve_url(text_node.url, basepath), "alt": text_node.text})
         
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
     """Splits each TextNode based on the delimiter passed to the function
@@ -85,48 +116,48 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type:
     return new_nodes
 
 
-def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
-    """Splits the TextNodes based on markdown images within the text
+def split_nodes_matches(old_nodes: list[TextNode], find_matches: Callable[[str], Iterator[re.Match]], text_type: TextType) -> list[TextNode]:
+    """Splits the TextNodes around every match found in their text
+
+    Each node is split in one pass using the match offsets, so the cost is linear in the
+    total text length no matter how many matches there are. The given nodes are not modified.
 
     Args:
-        old_nodes (list[TextNode]): The list of old nodes that will be checked for images
+        old_nodes (list[TextNode]): The list of old nodes to be split
+        find_matches (Callable[[str], Iterator[re.Match]]): Finds the matches in a node's text,
+            with the node text in group 1 and the url in group 2
+        text_type (TextType): The text type of the nodes created from the matches
 
     Returns:
-        list[TextNode]: The resulting list of TextNodes after splitting out the images
+        list[TextNode]: The resulting list of TextNodes after splitting out the matches
     """
     new_nodes = []
     for node in old_nodes:
-        if node.text_type not in TextType:
+        position = 0
+        for match in find_matches(node.text):
+            if match.start() > position:
+                new_nodes.append(TextNode(node.text[position:match.start()], node.text_type))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+
+        if position == 0:
             new_nodes.append(node)
-            continue
-
-        matches = extract_markdown_images(node.text)
-
-        new_nodes = old_nodes.copy()
-        for match in matches:
-            delim = f"![{match[0]}]({match[1]})"
-            working_list = []
-            for curr_node in new_nodes:
-                hasRun = False
-                while len(curr_node.text.split(delim, maxsplit=1)) > 1:
-                    hasRun = True
-                    split_node = curr_node.text.split(delim, maxsplit=1)
-                    curr_node.text = split_node[1]
-                    if split_node[0]:
-                        new_node = TextNode(split_node[0], node.text_type)
-                        working_list.append(new_node)
-                    new_node = TextNode(match[0], TextType.IMAGE, match[1])
-                    working_list.append(new_node)
-                if curr_node.text:
-                    if hasRun:
-                        new_node = TextNode(curr_node.text, node.text_type)
-                        working_list.append(new_node)
-                    else:
-                        working_list.append(curr_node)
-            new_nodes = working_list
+        elif position < len(node.text):
+            new_nodes.append(TextNode(node.text[position:], node.text_type))
 
     return new_nodes
 
+def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
+    """Splits the TextNodes based on markdown images within the text
+
+    Args:
+        old_nodes (list[TextNode]): The list of old nodes that will be checked for images
+
+    Returns:
+        list[TextNode]: The resulting list of TextNodes after splitting out the images
+    """
+    return split_nodes_matches(old_nodes, iter_markdown_images, TextType.IMAGE)
+
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """Splits the TextNodes based on markdown links within the text
 
@@ -136,41 +167,151 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         list[TextNode]: The resulting list of TextNodes after splitting out the links
     """
-    new_nodes = []
-    for node in old_nodes:
-        if node.text_type not in TextType:
-            new_nodes.append(node)
+    return split_nodes_matches(old_nodes, iter_markdown_links, TextType.LINK)
+
+INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+# The tags of the spans that are only wrapped, links and images also carry their url
+INLINE_TAGS = {
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+INLINE_TOKEN_PATTERN = re.compile(
+    r"!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\)"
+    r"|(?P<delimiter>\*\*|_|`)"
+)
+
+def text_to_textnodes(text: str) -> list[TextNode]:
+    """Converts raw markdown text to TextNode objects in a single left to right pass
+
+    Produces the same nodes as text_to_textnodes_legacy for well formed text, in time
+    linear in the length of the text. Delimiters may nest, and the innermost one decides
+    the text type. Where the legacy passes split markdown inside other spans, this
+    differs from them: code spans are literal (ex: "`snake_case`" or "`[x](y)`"), and
+    images and links are matched before any delimiters inside them, so urls containing
+    "_" are kept intact. Text the legacy passes reject for that reason, or for nesting
+    bold inside italic (ex: "_a **b** c_"), may convert here.
+
+    Args:
+        text (str): The raw markdown text to be converted
+
+    Raises:
+        Exception: A delimiter is missing its matching closing delimiter
+
+    Returns:
+        list[TextNode]: The resulting list of TextNodes
+    """
+    return tokenize_inline(text, TextNode)
+
+def text_to_html(text: str, basepath: str = "/") -> list[str]:
+    """Converts raw markdown text straight to the HTML of each inline span
+
+    Gives the same HTML as serializing the LeafNodes of text_to_children, without
+    creating a TextNode or LeafNode for any span.
+
+    Args:
+        text (str): The raw markdown text to be converted
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+
+    Raises:
+        Exception: A delimiter is missing its matching closing delimiter
+
+    Returns:
+        list[str]: The HTML of each span
+    """
+    def span_html(span_text: str, text_type: TextType, url: str = None) -> str:
+        if text_type is TextType.TEXT:
+            return span_text
+        if text_type is TextType.LINK:
+            return f'<a href="{resolve_url(url, basepath)}">{span_text}</a>'
+        if text_type is TextType.IMAGE:
+            return f'<img src="{resolve_url(url, basepath)}" alt="{span_text}"></img>'
+        tag = INLINE_TAGS[text_type]
+        return f"<{tag}>{span_text}</{tag}>"
+
+    return tokenize_inline(text, span_html)
+
+def tokenize_inline(text: str, make_span: Callable[..., object]) -> list:
+    """Splits raw markdown text into its inline spans in a single left to right pass
+
+    Args:
+        text (str): The raw markdown text to be split
+        make_span (Callable[..., object]): Called with the text and TextType of each
+            span, and the url for links and images, to create what is returned for it
+
+    Raises:
+        Exception: A delimiter is missing its matching closing delimiter
+
+    Returns:
+        list: The value make_span returned for each span, in order
+    """
+    nodes = []
+    open_delims = []
+    span_starts = []
+    position = 0
+
+    def close_span(end: int):
+        delimiter = open_delims.pop()
+        span_start = span_starts.pop()
+        # Like the chained passes of text_to_textnodes_legacy, empty bold and italic spans
+        # are dropped (ex: "****") and empty code spans are kept
+        if text[position:end] or (delimiter == "`" and len(nodes) == span_start):
+            nodes.append(make_span(text[position:end], INLINE_DELIMITERS[delimiter]))
+
+    while True:
+        if open_delims and open_delims[-1] == "`":
+            end = text.find("`", position)
+            if end == -1:
+                break
+            close_span(end)
+            position = end + 1
             continue
 
-        matches = extract_markdown_links(node.text)
-
-        new_nodes = old_nodes.copy()
-        for match in matches:
-            delim = f"[{match[0]}]({match[1]})"
-            working_list = []
-            for curr_node in new_nodes:
-                hasRun = False
-                while len(curr_node.text.split(delim, maxsplit=1)) > 1:
-                    hasRun = True
-                    split_node = curr_node.text.split(delim, maxsplit=1)
-                    curr_node.text = split_node[1]
-                    if split_node[0]:
-                        new_node = TextNode(split_node[0], node.text_type)
-                        working_list.append(new_node)
-                    new_node = TextNode(match[0], TextType.LINK, match[1])
-                    working_list.append(new_node)
-                if curr_node.text:
-                    if hasRun:
-                        new_node = TextNode(curr_node.text, node.text_type)
-                        working_list.append(new_node)
-                    else:
-                        working_list.append(curr_node)
-            new_nodes = working_list
+        match = INLINE_TOKEN_PATTERN.search(text, position)
+        if match is None:
+            break
 
-    return new_nodes
+        delimiter = match.group("delimiter")
+        if delimiter is not None and open_delims and open_delims[-1] == delimiter:
+            close_span(match.start())
+            position = match.end()
+            continue
+        if delimiter is not None and delimiter in open_delims:
+            raise Exception(f"Invalid syntax, missing matching '{open_delims[-1]}' in {text}")
+
+        pending = text[position:match.start()]
+        if pending:
+            text_type = INLINE_DELIMITERS[open_delims[-1]] if open_delims else TextType.TEXT
+            nodes.append(make_span(pending, text_type))
+
+        if delimiter is not None:
+            open_delims.append(delimiter)
+            span_starts.append(len(nodes))
+        elif match.lastgroup == "image_url":
+            nodes.append(make_span(match.group("image_alt"), TextType.IMAGE, match.group("image_url")))
+        else:
+            nodes.append(make_span(match.group("link_text"), TextType.LINK, match.group("link_url")))
+        position = match.end()
 
-def text_to_textnodes(text: str) -> list[TextNode]:
-    """Converts raw markdown text to TextNode objects
+    if open_delims:
+        raise Exception(f"Invalid syntax, missing matching '{open_delims[-1]}' in {text}")
+    if position < len(text):
+        nodes.append(make_span(text[position:], TextType.TEXT))
+
+    return nodes
+
+def text_to_textnodes_legacy(text: str) -> list[TextNode]:
+    """Converts raw markdown text to TextNode objects by chaining the split_nodes_* passes
+
+    Kept as a compatibility path for text_to_textnodes.
 
     Args:
         text (str): The raw markdown text to be converted
@@ -199,17 +340,121 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     Returns:
         list[str]: The list containing the text for each markdown block
     """
-    blocks = []
-    splits = markdown.split("\n\n")
+    return list(pieces_to_blocks(markdown.split("\n\n")))
+
+def pieces_to_blocks(pieces: Iterable[str]) -> Iterator[str]:
+    """Turns the pieces of markdown between blank lines ("\n\n") into blocks
+
+    Args:
+        pieces (Iterable[str]): The markdown split on "\n\n", in order
+
+    Yields:
+        str: The text of the next markdown block
+    """
+    fenced = []
+    fence_count = 0
+
+    for split in pieces:
+        # A code block with blank lines in it is split apart, join it back until the fence closes
+        if fenced:
+            fenced.append(split)
+            fence_count += split.count(CODE_FENCE)
+            if fence_count % 2:
+                continue
+            split = "\n\n".join(fenced)
+            fenced = []
+        elif split.lstrip().startswith(CODE_FENCE):
+            fence_count = split.count(CODE_FENCE)
+            if fence_count % 2:
+                fenced.append(split)
+                continue
 
-    for split in splits:
         split = split.strip()
         if not split:
             continue
         
-        blocks.append(split)
+        yield split
+
+    if fenced:
+        yield "\n\n".join(fenced).strip()
+
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Reads markdown blocks lazily from lines of markdown, such as an open file
+
+    Only the lines of the current block are held, so very large files are split
+    with bounded memory. The blocks are the same as markdown_to_blocks returns.
+
+    Args:
+        lines (Iterable[str]): The lines of markdown, with or without their newlines
+
+    Yields:
+        str: The text of the next markdown block
+    """
+    block_lines = []
+    fence_count = 0
+    fenced = None
 
-    return blocks
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+
+        if line:
+            block_lines.append(line)
+            fence_count += line.count(CODE_FENCE)
+            # Whether the block is a code block is decided by its first line with text
+            if fenced is None and not line.isspace():
+                fenced = line.lstrip().startswith(CODE_FENCE)
+            continue
+
+        if fenced and fence_count % 2:
+            block_lines.append(line)
+            continue
+
+        block = "\n".join(block_lines).strip()
+        if block:
+            yield block
+        block_lines = []
+        fence_count = 0
+        fenced = None
+
+    block = "\n".join(block_lines).strip()
+    if block:
+        yield block
+
+def iter_markdown_file_blocks(path: str) -> Iterator[str]:
+    """Reads markdown blocks lazily from a file through a memory map
+
+    The blank lines between blocks are found in the raw bytes and only one block
+    is decoded at a time. Files with carriage returns, whose newlines text mode
+    would translate, and systems whose default encoding is not UTF-8 are read
+    line by line instead.
+
+    Args:
+        path (str): The markdown file path
+
+    Yields:
+        str: The text of the next markdown block
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if _DEFAULT_ENCODING_IS_UTF8 and mapped.find(b"\r") == -1:
+                yield from pieces_to_blocks(_iter_mapped_pieces(mapped))
+                return
+
+    with open(path, "r") as f:
+        yield from iter_markdown_blocks(f)
+
+def _iter_mapped_pieces(mapped: mmap.mmap) -> Iterator[str]:
+    start = 0
+    while True:
+        end = mapped.find(b"\n\n", start)
+        if end == -1:
+            yield mapped[start:].decode("utf-8")
+            return
+        yield mapped[start:end].decode("utf-8")
+        start = end + 2
 
 def is_block_quote(block: str) -> bool:
     """Checks to see if a given block is a quote block
@@ -261,6 +506,41 @@ def is_block_ordered_list(block: str) -> bool:
         list_num += 1
     return True
 
+def classify_block(block: str) -> tuple[BlockType, list[str] | None, int]:
+    """Gets the block type for the given block, deciding from its first character
+    and checking its lines at most once
+
+    Args:
+        block (str): The block to be checked
+
+    Returns:
+        tuple[BlockType, list[str] | None, int]: The type for the given block, its lines
+            for quote and list blocks (None for the other types), and the heading level
+            for headings (0 for the other types)
+    """
+    start_type, level = classify_block_start(block)
+    if start_type == HEADING:
+        return BlockType.HEADING, None, level
+    if start_type == CODE:
+        return BlockType.CODE, None, 0
+
+    match block[:1]:
+        case ">":
+            lines = block.splitlines()
+            if all(line.startswith(">") for line in lines):
+                return BlockType.QUOTE, lines, 0
+        case "-":
+            lines = block.splitlines()
+            if all(line.startswith("- ") for line in lines):
+                return BlockType.UNORDERED_LIST, lines, 0
+        case "1":
+            lines = block.splitlines()
+            if all(line.startswith(f"{list_num}. ") for list_num, line in enumerate(lines, 1)):
+                return BlockType.ORDERED_LIST, lines, 0
+        case "":
+            return BlockType.QUOTE, [], 0
+    return BlockType.PARAGRAPH, None, 0
+
 def block_to_block_type(block: str) -> BlockType:
     """Gets the block type for the given block
 
@@ -270,24 +550,32 @@ def block_to_block_type(block: str) -> BlockType:
     Returns:
         BlockType: The type for the given block
     """
-    if is_block_heading(block):
-        return BlockType.HEADING
-    if is_block_code(block):
-        return BlockType.CODE
-    if is_block_quote(block):
-        return BlockType.QUOTE
-    if is_block_unordered_list(block):
-        return BlockType.UNORDERED_LIST
-    if is_block_ordered_list(block):
-        return BlockType.ORDERED_LIST
-    return BlockType.PARAGRAPH
-
-def get_text_from_block(block: str, block_type: BlockType) -> str:
+    return classify_block(block)[0]
+
+def get_list_items(block_type: BlockType, lines: list[str]) -> list[str]:
+    """Gets the text of each item in a list block (removing the list format text)
+
+    Args:
+        block_type (BlockType): UNORDERED_LIST or ORDERED_LIST
+        lines (list[str]): The lines of the list block
+
+    Returns:
+        list[str]: The raw text of each item
+    """
+    if block_type == BlockType.UNORDERED_LIST:
+        return [line.lstrip("- ") for line in lines]
+    return [remove_ordered_list_prefix(line) for line in lines]
+
+def get_text_from_block(block: str, block_type: BlockType, lines: list[str] | None = None, level: int = 0) -> str:
     """Gets the raw text from a markdown block (removing the block format text)
 
     Args:
         block (str): The block containing the text
         block_type (BlockType): The type of the corresponding block
+        lines (list[str] | None): The lines of the block returned by classify_block,
+            split from the block when not given
+        level (int): The heading level returned by classify_block, found from the
+            block when not given
 
     Raises:
         Exception: An invalid block type was received
@@ -297,55 +585,61 @@ def get_text_from_block(block: str, block_type: BlockType) -> str:
     """
     match block_type:
         case BlockType.HEADING:
-            heading = get_heading(block)
+            heading = "#" * level + " " if level else get_heading(block)
             return block.replace(heading, "").lstrip("\n")
         case BlockType.CODE:
             return block.replace("```", "").lstrip("\n")
         case BlockType.QUOTE:
-            lines = block.splitlines()
-            text = []
-            for line in lines:
-                text.append(line.lstrip("> "))
-            return " ".join(text)
-        case BlockType.UNORDERED_LIST:
-            lines = block.splitlines()
-            text = []
-            for line in lines:
-                text.append(line.lstrip("- "))
-            return "\n".join(text)
-        case BlockType.ORDERED_LIST:
-            lines = block.splitlines()
-            text = []
-            for line in lines:
-                text.append(remove_ordered_list_prefix(line))
-            return "\n".join(text)
+            if lines is None:
+                lines = block.splitlines()
+            return " ".join(line.lstrip("> ") for line in lines)
+        case BlockType.UNORDERED_LIST | BlockType.ORDERED_LIST:
+            if lines is None:
+                lines = block.splitlines()
+            return "\n".join(get_list_items(block_type, lines))
         case BlockType.PARAGRAPH:
             return block.replace("\n", " ")
         case _:
             raise Exception("Invalid block type received.")
 
-def text_to_children(text: str) -> list[LeafNode]:
+def text_to_children(text: str, basepath: str = "/") -> list[LeafNode]:
     """Gets the LeafNodes (children) for the given text
 
     Args:
         text (str): The raw text of a block (children of the block)
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
 
     Returns:
         list[LeafNode]: The LeafNodes for a block (its children)
     """
     children = []
-    text_nodes = text_to_textnodes(text)
+    with stage("inline"):
+        text_nodes = text_to_textnodes(text)
     for node in text_nodes:
-        children.append(text_node_to_html_node(node))
+        children.append(text_node_to_html_node(node, basepath))
     
     return children
 
-def block_to_html_node(block: str, block_type: BlockType) -> ParentNode:
+def _inline_parent(tag: str, text: str, basepath: str, lazy: bool) -> ParentNode:
+    if lazy:
+        return ParentNode.lazy(tag, partial(text_to_children, text, basepath))
+    return ParentNode(tag, text_to_children(text, basepath))
+
+def block_to_html_node(block: str, block_type: BlockType, lines: list[str] | None = None, basepath: str = "/", lazy: bool = False, level: int = 0) -> ParentNode:
     """Converts a markdown block to an HTMLNode (ParentNode)
 
     Args:
         block (str): A markdown block
         block_type (BlockType): The corresponding type for the given block
+        lines (list[str] | None): The lines of the block returned by classify_block,
+            split from the block when not given
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+        lazy (bool): Only tokenize the inline text of the block when its children are
+            first accessed or serialized. Inline syntax errors are raised then.
+        level (int): The heading level returned by classify_block, found from the
+            block when not given
 
     Raises:
         Exception: An invalid block type was received
@@ -355,57 +649,247 @@ def block_to_html_node(block: str, block_type: BlockType) -> ParentNode:
     """
     match block_type:
         case BlockType.HEADING:
-            heading = get_heading(block)
-            text = get_text_from_block(block, block_type)
-            children = text_to_children(text)
-            return ParentNode(f"h{len(heading) - 1}", children)
+            level = level or len(get_heading(block)) - 1
+            text = get_text_from_block(block, block_type, level=level)
+            return _inline_parent(f"h{level}", text, basepath, lazy)
         case BlockType.CODE:
             text = get_text_from_block(block, block_type)
             code_text_block = TextNode(text, TextType.CODE)
             html_node = text_node_to_html_node(code_text_block)
             return ParentNode("pre", [html_node])
         case BlockType.QUOTE:
-            text = get_text_from_block(block, block_type)
-            children = text_to_children(text)
-            return ParentNode("blockquote", children)
-        case BlockType.UNORDERED_LIST:
-            text = get_text_from_block(block, block_type)
-            children = []
-            for line in text.splitlines():
-                child = text_to_children(line)
-                children.append(ParentNode("li", child))
-            return ParentNode("ul", children)
-        case BlockType.ORDERED_LIST:
-            text = get_text_from_block(block, block_type)
-            children = []
-            for line in text.splitlines():
-                child = text_to_children(line)
-                children.append(ParentNode("li", child))
-            return ParentNode("ol", children)
+            text = get_text_from_block(block, block_type, lines)
+            return _inline_parent("blockquote", text, basepath, lazy)
+        case BlockType.UNORDERED_LIST | BlockType.ORDERED_LIST:
+            if lines is None:
+                lines = block.splitlines()
+            items = get_list_items(block_type, lines)
+            # Empty items at the end are left out, as in get_text_from_block(...).splitlines()
+            while items and not items[-1]:
+                items.pop()
+            children = [_inline_parent("li", item, basepath, lazy) for item in items]
+            return ParentNode("ul" if block_type == BlockType.UNORDERED_LIST else "ol", children)
         case BlockType.PARAGRAPH:
             text = get_text_from_block(block, block_type)
-            children = text_to_children(text)
-            return ParentNode("p", children)
+            return _inline_parent("p", text, basepath, lazy)
         case _:
             raise Exception("Invalid block type received.")
     
     return 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
+def block_to_html(block: str, block_type: BlockType, lines: list[str] | None = None, basepath: str = "/", level: int = 0) -> str:
+    """Converts a markdown block straight to its HTML string
+
+    Gives the same HTML as block_to_html_node(...).to_html(), appending the HTML of
+    each span to a string buffer instead of building a node for every span.
+
+    Args:
+        block (str): A markdown block
+        block_type (BlockType): The corresponding type for the given block
+        lines (list[str] | None): The lines of the block returned by classify_block,
+            split from the block when not given
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+        level (int): The heading level returned by classify_block, found from the
+            block when not given
+
+    Raises:
+        ValueError: The block or one of its list items has no text, so its node would be invalid
+        Exception: An invalid block type was received
+
+    Returns:
+        str: The HTML of the block
+    """
+    match block_type:
+        case BlockType.HEADING:
+            level = level or len(get_heading(block)) - 1
+            text = get_text_from_block(block, block_type, level=level)
+            return _wrap_html(f"h{level}", _inline_html(text, basepath))
+        case BlockType.CODE:
+            text = get_text_from_block(block, block_type)
+            count_spans(1)
+            return f"<pre><code>{text}</code></pre>"
+        case BlockType.QUOTE:
+            text = get_text_from_block(block, block_type, lines)
+            return _wrap_html("blockquote", _inline_html(text, basepath))
+        case BlockType.UNORDERED_LIST | BlockType.ORDERED_LIST:
+            if lines is None:
+                lines = block.splitlines()
+            items = get_list_items(block_type, lines)
+            while items and not items[-1]:
+                items.pop()
+            children = [_wrap_html("li", _inline_html(item, basepath)) for item in items]
+            return _wrap_html("ul" if block_type == BlockType.UNORDERED_LIST else "ol", children)
+        case BlockType.PARAGRAPH:
+            text = get_text_from_block(block, block_type)
+            return _wrap_html("p", _inline_html(text, basepath))
+        case _:
+            raise Exception("Invalid block type received.")
+
+def _inline_html(text: str, basepath: str) -> list[str]:
+    with stage("inline"):
+        spans = text_to_html(text, basepath)
+    count_spans(len(spans))
+    return spans
+
+def _wrap_html(tag: str, children: list[str]) -> str:
+    # Matches ParentNode, which cannot be serialized without children
+    if not children:
+        raise ValueError("ParentNode missing children")
+    return f"<{tag}>{''.join(children)}</{tag}>"
+
+def cached_block_to_html_node(block: str, cache: RenderCache, basepath: str = "/") -> HTMLNode:
+    """Converts a markdown block to an HTMLNode, reusing its cached HTML when available
+
+    Args:
+        block (str): A markdown block
+        cache (RenderCache): The cache of rendered blocks
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+
+    Returns:
+        HTMLNode: A LeafNode holding the pre-serialized HTML on a cache hit,
+            otherwise the block converted to a ParentNode
+    """
+    with stage("render_cache"):
+        key = make_key(CONVERTER_VERSION, basepath, block)
+        html = cache.get(key)
+    if html is not None:
+        return LeafNode(None, html)
+
+    with stage("block_type"):
+        block_type, lines, level = classify_block(block)
+    with stage("block_tree"):
+        html_node = block_to_html_node(block, block_type, lines, basepath, level=level)
+    with stage("serialize"):
+        html = html_node.to_html()
+    if not isinstance(html, ValueError):
+        cache.put(key, html)
+    return html_node
+
+def blocks_to_html_nodes(blocks: Iterable[str], cache: RenderCache = None, basepath: str = "/", lazy: bool = False) -> Iterator[HTMLNode]:
+    """Converts markdown blocks to HTMLNodes lazily, one block at a time
+
+    Args:
+        blocks (Iterable[str]): The markdown blocks to be converted
+        cache (RenderCache): Optional cache of rendered blocks. Blocks found in it are
+            not tokenized and come back as LeafNodes holding their HTML.
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+        lazy (bool): Build the children of each block only when they are first needed,
+            blocks found in the cache are not affected
+
+    Yields:
+        HTMLNode: The node for the next block
+    """
+    for block in blocks:
+        if cache is not None:
+            yield cached_block_to_html_node(block, cache, basepath)
+            continue
+        with stage("block_type"):
+            block_type, lines, level = classify_block(block)
+        with stage("block_tree"):
+            html_node_block = block_to_html_node(block, block_type, lines, basepath, lazy, level)
+        yield html_node_block
+
+def blocks_to_html(blocks: Iterable[str], cache: RenderCache = None, basepath: str = "/") -> Iterator[str]:
+    """Converts markdown blocks to their HTML strings lazily, one block at a time
+
+    The fast path of blocks_to_html_nodes for callers that only need the HTML. The
+    cache holds the same fragments as the node path, so either can reuse them.
+
+    Args:
+        blocks (Iterable[str]): The markdown blocks to be converted
+        cache (RenderCache): Optional cache of rendered blocks
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+
+    Yields:
+        str: The HTML of the next block
+
+    Raises:
+        ValueError: A block has no text to convert
+    """
+    for block in blocks:
+        if cache is not None:
+            with stage("render_cache"):
+                key = make_key(CONVERTER_VERSION, basepath, block)
+                html = cache.get(key)
+            if html is not None:
+                yield html
+                continue
+        with stage("block_type"):
+            block_type, lines, level = classify_block(block)
+        with stage("render"):
+            html = block_to_html(block, block_type, lines, basepath, level)
+        if cache is not None:
+            cache.put(key, html)
+        yield html
+
+def markdown_to_html_node(markdown: str | Iterable[str], cache: RenderCache = None, basepath: str = "/", lazy: bool = False) -> ParentNode:
     """Converts raw markdown to HTML
 
     Args:
-        markdown (str): The raw markdown to be converted
+        markdown (str | Iterable[str]): The raw markdown to be converted, or its blocks
+            already split (ex: from iter_markdown_blocks)
+        cache (RenderCache): Optional cache of rendered blocks. Blocks found in it are
+            not tokenized and come back as LeafNodes holding their HTML.
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+        lazy (bool): Only tokenize the inline text of a block when its children are
+            first accessed or serialized (ex: to read the outline of a document)
 
     Returns:
         ParentNode: The HTML for the given markdown text
     """
-    blocks = markdown_to_blocks(markdown)
+    if isinstance(markdown, str):
+        with stage("split_blocks"):
+            blocks = markdown_to_blocks(markdown)
+    else:
+        blocks = markdown
     
-    children = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        html_node_block = block_to_html_node(block, block_type)
-        children.append(html_node_block)
-    return ParentNode("div", children)
-        
\ No newline at end of file
+    return ParentNode("div", list(blocks_to_html_nodes(blocks, cache, basepath, lazy)))
+
+def iter_markdown_html(blocks: Iterable[str], cache: RenderCache = None, basepath: str = "/") -> Iterator[str]:
+    """Converts markdown blocks to serialized HTML lazily, without building any node tree
+
+    Yields the same HTML as markdown_to_html_node(blocks).to_html(), while only one
+    block is held at a time.
+
+    Args:
+        blocks (Iterable[str]): The markdown blocks to be converted
+        cache (RenderCache): Optional cache of rendered blocks
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+
+    Yields:
+        str: The opening div, the HTML of each block, then the closing div
+
+    Raises:
+        ValueError: A block converted to an invalid node
+    """
+    yield "<div>"
+    yield from blocks_to_html(blocks, cache, basepath)
+    yield "</div>"
+
+def markdown_to_html(markdown: str, cache: RenderCache = None, basepath: str = "/") -> str:
+    """Converts raw markdown straight to an HTML string
+
+    Gives the same HTML as markdown_to_html_node(markdown).to_html() without building
+    any node, and an empty div for a document with no blocks.
+
+    Args:
+        markdown (str): The raw markdown to be converted
+        cache (RenderCache): Optional cache of rendered blocks
+        basepath (str): The root path the site is hosted under, link and image urls
+            are resolved against it
+
+    Returns:
+        str: The HTML for the given markdown text
+
+    Raises:
+        ValueError: A block converted to an invalid node
+    """
+    with stage("split_blocks"):
+        blocks = markdown_to_blocks(markdown)
+    return "".join(iter_markdown_html(blocks, cache, basepath))
@@ -0,0 +1,164 @@
+import json
+import os
+import socket
+import socketserver
+import time
+from contextlib import redirect_stdout
+
+from utils.context import BuildContext
+from utils.daemon_client import send_message
+from utils.discovery import DirectoryIndex
+from utils.manifest import BuildManifest, FileHashCache
+from utils.render_cache import RenderCache
+from utils.site_gen import generate_pages_recursive
+from utils.sync import sync_directory
+
+class _ProgressWriter:
+    """File-like object that sends every line written to it to the client as it is printed"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.buffer = ""
+        self.connected = True
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        for line in lines:
+            self._send_line(line)
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            self._send_line(self.buffer)
+            self.buffer = ""
+
+    def _send_line(self, line: str):
+        # A client that went away does not stop the build, its output is dropped
+        if not self.connected:
+            return
+        try:
+            send_message(self.wfile, {"output": line})
+        except OSError:
+            self.connected = False
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.build_daemon.handle_request(self.rfile, self.wfile)
+
+
+class BuildDaemon:
+    """Long running build server that keeps the converter loaded and its state warm
+
+    Builds are requested over a Unix socket. Between builds the daemon keeps the
+    compiled template, the file hashes the incremental manifest compares (reused
+    while a file's size and mtime are unchanged), the directory listings of the
+    content and the memory tier of the render cache, so a build only costs the work
+    for what changed. Builds run one at a time.
+    """
+
+    def __init__(self, socket_path: str, content_dir: str, static_dir: str, template_path: str, dest_dir: str, manifest_path: str, cache: RenderCache = None):
+        self.socket_path = socket_path
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.manifest_path = manifest_path
+        self.cache = cache if cache is not None else RenderCache()
+        self.hash_cache = FileHashCache()
+        self.index = DirectoryIndex()
+        self._stopping = False
+
+    def build(self, basepath: str = "/", incremental: bool = True):
+        """Builds the site into the destination directory, printing its progress
+
+        Args:
+            basepath (str): The root path the site is hosted under
+            incremental (bool): Only render pages that changed since the last build
+        """
+        if incremental:
+            manifest = BuildManifest.load(self.manifest_path, self.hash_cache)
+        else:
+            manifest = BuildManifest(self.manifest_path, hash_cache=self.hash_cache)
+        context = BuildContext(self.content_dir, self.template_path, self.dest_dir, basepath, manifest, self.cache, self.index)
+
+        pages = {dest for _, dest in context.pages()}
+        if os.path.isdir(self.static_dir):
+            graph = manifest.graph if incremental else None
+            copied, removed = sync_directory(self.static_dir, self.dest_dir, keep=pages, graph=graph)
+            print(f"Synced static files: {len(copied)} copied, {len(removed)} removed")
+
+        generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, basepath, context=context)
+        for path in manifest.prune():
+            print(f"Removed stale page {path}")
+        manifest.save()
+
+    def handle_request(self, rfile, wfile):
+        """Reads one JSON request line and streams the response back as JSON lines
+
+        A build request ({"command": "build", "basepath": "/", "incremental": true})
+        gets an {"output": line} message for every line the build prints, then a
+        final {"status": "ok" | "error"} message. {"command": "stop"} stops the daemon.
+
+        Args:
+            rfile: The file-like object the request is read from
+            wfile: The file-like object the response is written to
+        """
+        try:
+            request = json.loads(rfile.readline())
+        except ValueError:
+            send_message(wfile, {"status": "error", "message": "Invalid request"})
+            return
+
+        command = request.get("command") if isinstance(request, dict) else None
+        if command == "stop":
+            self._stopping = True
+            send_message(wfile, {"status": "ok", "message": "Stopping"})
+            return
+        if command != "build":
+            send_message(wfile, {"status": "error", "message": f"Invalid command received: {command}"})
+            return
+
+        writer = _ProgressWriter(wfile)
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(writer):
+                self.build(request.get("basepath", "/"), request.get("incremental", True))
+        except Exception as e:
+            writer.flush()
+            if writer.connected:
+                send_message(wfile, {"status": "error", "message": str(e)})
+            return
+
+        writer.flush()
+        if writer.connected:
+            send_message(wfile, {"status": "ok", "message": f"Built in {time.perf_counter() - start:.3f} s"})
+
+    def serve(self):
+        """Accepts requests on the socket until a stop request
+
+        Raises:
+            Exception: Another daemon is already listening on the socket
+        """
+        _remove_stale_socket(self.socket_path)
+        with socketserver.UnixStreamServer(self.socket_path, _DaemonRequestHandler) as server:
+            server.build_daemon = self
+            try:
+                while not self._stopping:
+                    server.handle_request()
+            finally:
+                os.unlink(self.socket_path)
+
+
+def _remove_stale_socket(socket_path: str):
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(socket_path)
+            return
+    raise Exception(f"A build daemon is already listening on {socket_path}")
@@ -0,0 +1,46 @@
+import json
+import socket
+import sys
+
+# Only the standard library is imported here, so a client starts without loading the converter
+
+def send_message(wfile, message: dict):
+    """Writes one message of the daemon protocol, a line of JSON
+
+    Args:
+        wfile: The binary file-like object the message is written to
+        message (dict): The message
+    """
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+def send_request(socket_path: str, request: dict, out=None) -> dict:
+    """Sends a request to the build daemon, writing the build output as it arrives
+
+    Args:
+        socket_path (str): The daemon's Unix socket
+        request (dict): The request (ex: {"command": "build", "basepath": "/"})
+        out: The file-like object the build output is written to, stdout by default
+
+    Raises:
+        Exception: No daemon is listening on the socket, or it closed the connection early
+
+    Returns:
+        dict: The final status message from the daemon
+    """
+    out = out if out is not None else sys.stdout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError as e:
+            raise Exception(f"No build daemon is listening on {socket_path}: {e}") from e
+
+        with client.makefile("rwb") as connection:
+            send_message(connection, request)
+            for line in connection:
+                message = json.loads(line)
+                if "output" in message:
+                    print(message["output"], file=out, flush=True)
+                    continue
+                return message
+    raise Exception("The build daemon closed the connection without a status")
@@ -0,0 +1,237 @@
+import os
+import time
+from typing import Callable, Iterable
+
+# Files modified this recently may change again within the same mtime tick, so their
+# signature is not trusted and they are hashed again on the next check
+RACY_WINDOW_NS = 2_000_000_000
+
+class DependencyGraph:
+    """Which input files every output file was built from
+
+    Each output maps to the inputs it read and a reverse index maps each input to the
+    outputs that read it, so the outputs affected by a set of changed inputs are found
+    without visiting any of the others. Every input also keeps the size, mtime and hash
+    it had when it was recorded, so finding the changed inputs only hashes the files
+    whose size or mtime moved.
+
+    An output must be recorded with the state its inputs had when it read them, so
+    callers take a snapshot of every input before reading it. The graph is loaded for
+    each build, and an input is only snapshotted once per graph.
+    """
+
+    def __init__(self, hasher: Callable[[str], str], outputs: dict = None, inputs: dict = None):
+        self.hasher = hasher
+        self.outputs: dict[str, list[str]] = outputs if outputs is not None else {}
+        self.inputs: dict[str, dict] = inputs if inputs is not None else {}
+        self._dependents: dict[str, set[str]] = {}
+        for output, dependencies in self.outputs.items():
+            for path in dependencies:
+                self._dependents.setdefault(path, set()).add(output)
+        self._stale = None
+        self._snapshots: dict[str, dict] = {}
+
+    @classmethod
+    def from_dict(cls, data: dict, hasher: Callable[[str], str]) -> "DependencyGraph":
+        """Creates a graph from the data written by to_dict, starting empty if it is invalid
+
+        Args:
+            data (dict): The saved graph
+            hasher (Callable[[str], str]): Gets the hash of a file's contents
+
+        Returns:
+            DependencyGraph: The loaded graph
+        """
+        if not isinstance(data, dict):
+            return cls(hasher)
+        outputs = data.get("outputs")
+        inputs = data.get("inputs")
+        if not isinstance(outputs, dict) or not isinstance(inputs, dict):
+            return cls(hasher)
+        if any(path not in inputs for dependencies in outputs.values() for path in dependencies):
+            return cls(hasher)
+        return cls(hasher, outputs, inputs)
+
+    def to_dict(self) -> dict:
+        """Gets the graph as JSON serializable data
+
+        Returns:
+            dict: The outputs with their inputs, and the recorded state of every input
+        """
+        return {"outputs": self.outputs, "inputs": self.inputs}
+
+    def dependencies(self, output: str) -> list[str]:
+        """Gets the inputs an output was built from
+
+        Args:
+            output (str): The output file path
+
+        Returns:
+            list[str]: The input paths in the order they were recorded, empty if the output is unknown
+        """
+        return list(self.outputs.get(output, ()))
+
+    def dependents(self, path: str) -> set[str]:
+        """Gets the outputs built from an input
+
+        Args:
+            path (str): The input file path
+
+        Returns:
+            set[str]: The output paths
+        """
+        return set(self._dependents.get(path, ()))
+
+    def snapshot(self, path: str) -> dict:
+        """Captures the state of an input before it is read, reused for the rest of the build
+
+        The file is stat'ed before it is hashed, so an edit made after the snapshot leaves
+        an older size or mtime in the graph and its outputs are built again next time.
+        Inputs whose size and mtime match their recorded state are not hashed.
+
+        Args:
+            path (str): The input file path
+
+        Returns:
+            dict: The hash, size and mtime of the input
+
+        Raises:
+            OSError: The file cannot be read
+        """
+        if path not in self._snapshots:
+            self._snapshots[path] = self._input_state(path)
+        return self._snapshots[path]
+
+    def record(self, output: str, inputs: Iterable[str]):
+        """Records the inputs an output was just built from, replacing what it had before
+
+        Each input keeps the state snapshotted before it was read, the state of inputs
+        without a snapshot is taken now.
+
+        Args:
+            output (str): The output file path
+            inputs (Iterable[str]): The input file paths the output read
+        """
+        self.remove(output)
+        dependencies = list(dict.fromkeys(inputs))
+        self.outputs[output] = dependencies
+        for path in dependencies:
+            self._dependents.setdefault(path, set()).add(output)
+            state = self._snapshots.get(path)
+            self.inputs[path] = dict(state) if state is not None else self._input_state(path)
+        if self._stale is not None:
+            self._stale.discard(output)
+
+    def remove(self, output: str) -> bool:
+        """Forgets an output, and every input no other output was built from
+
+        Args:
+            output (str): The output file path
+
+        Returns:
+            bool: True if the output was in the graph
+        """
+        dependencies = self.outputs.pop(output, None)
+        if dependencies is None:
+            return False
+        for path in dependencies:
+            dependents = self._dependents.get(path)
+            dependents.discard(output)
+            if not dependents:
+                del self._dependents[path]
+                self.inputs.pop(path, None)
+        return True
+
+    def changed_inputs(self) -> set[str]:
+        """Finds the recorded inputs whose contents changed or that were removed
+
+        Every input is checked with a stat call, only the ones whose size or mtime
+        differ from when they were recorded are hashed.
+
+        Returns:
+            set[str]: The changed input paths
+        """
+        changed = set()
+        for path, state in self.inputs.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                changed.add(path)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) == (state["size"], state["mtime_ns"]):
+                continue
+            if self.hasher(path) != state["hash"]:
+                changed.add(path)
+                continue
+            # Touched without changing, remember the new mtime so it is not hashed again
+            state["size"], state["mtime_ns"] = stat.st_size, trusted_mtime(stat)
+        return changed
+
+    def affected(self, changed_paths: Iterable[str]) -> set[str]:
+        """Finds the outputs built from any of the changed paths
+
+        Only the changed paths and their own outputs are visited.
+
+        Args:
+            changed_paths (Iterable[str]): The input paths that changed
+
+        Returns:
+            set[str]: The output paths to be built again
+        """
+        affected = set()
+        for path in changed_paths:
+            affected.update(self._dependents.get(path, ()))
+        return affected
+
+    def stale_outputs(self) -> set[str]:
+        """Gets the outputs affected by the inputs changed since they were recorded
+
+        The changed inputs are found on the first call and reused after it, outputs
+        recorded since then are no longer stale.
+
+        Returns:
+            set[str]: The stale output paths
+        """
+        if self._stale is None:
+            self._stale = self.affected(self.changed_inputs())
+        return set(self._stale)
+
+    def is_stale(self, output: str) -> bool:
+        """Checks if an output is unknown or was built from inputs that changed since
+
+        Args:
+            output (str): The output file path
+
+        Returns:
+            bool: True if the output needs to be built again
+        """
+        if output not in self.outputs:
+            return True
+        if self._stale is None:
+            self.stale_outputs()
+        return output in self._stale
+
+    def _input_state(self, path: str) -> dict:
+        # Stat'ed before hashing, an edit in between leaves an older signature to be checked again
+        stat = os.stat(path)
+        recorded = self.inputs.get(path)
+        if recorded is not None and (stat.st_size, stat.st_mtime_ns) == (recorded["size"], recorded["mtime_ns"]):
+            return dict(recorded)
+        return {"hash": self.hasher(path), "size": stat.st_size, "mtime_ns": trusted_mtime(stat)}
+
+
+def trusted_mtime(stat: os.stat_result) -> int | None:
+    """Gets the mtime to record for a file, None when the file was modified too recently
+
+    A file written within the racy window can be written again without its mtime
+    moving, so its mtime is not recorded and the file is checked again next time.
+
+    Args:
+        stat (os.stat_result): The stat of the file
+
+    Returns:
+        int | None: The mtime in nanoseconds, None if it cannot be trusted yet
+    """
+    if time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS:
+        return None
+    return stat.st_mtime_ns
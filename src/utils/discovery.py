@@ -0,0 +1,130 @@
+import json
+import os
+
+from utils.depgraph import trusted_mtime
+
+INDEX_VERSION = 1
+
+def scan_directory(path: str) -> tuple[list[str], list[str]]:
+    """Lists the subdirectories and markdown files of a directory
+
+    The file types come from the directory entries, so no file is stat'ed on
+    filesystems that report them.
+
+    Args:
+        path (str): The directory to be listed
+
+    Returns:
+        tuple[list[str], list[str]]: The sorted subdirectory names, and the sorted markdown file names
+    """
+    dirs = []
+    pages = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                dirs.append(entry.name)
+            elif entry.name.endswith(".md") and entry.is_file():
+                pages.append(entry.name)
+    return sorted(dirs), sorted(pages)
+
+
+class DirectoryIndex:
+    """The subdirectories and markdown files of every content directory, kept between builds
+
+    Adding, removing or renaming an entry changes the mtime of its directory, so a
+    directory whose mtime still matches its record is only stat'ed, not listed again.
+    """
+
+    def __init__(self, path: str = None, directories: dict = None):
+        self.path = path
+        self.directories = directories if directories is not None else {}
+        self._listed = set()
+
+    @classmethod
+    def load(cls, path: str) -> "DirectoryIndex":
+        """Loads an index from disk, starting empty if it is missing or unreadable
+
+        Args:
+            path (str): The index file path
+
+        Returns:
+            DirectoryIndex: The loaded index
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or not isinstance(data.get("directories"), dict):
+            return cls(path)
+        return cls(path, data["directories"])
+
+    def save(self):
+        """Writes the directories listed since the index was loaded to disk atomically"""
+        directories = {path: entry for path, entry in self.directories.items() if path in self._listed}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "directories": directories}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def list_directory(self, path: str) -> tuple[list[str], list[str]]:
+        """Lists a directory like scan_directory, reusing its record while its mtime is unchanged
+
+        Args:
+            path (str): The directory to be listed
+
+        Returns:
+            tuple[list[str], list[str]]: The sorted subdirectory names, and the sorted markdown file names
+        """
+        self._listed.add(path)
+        stat = os.stat(path)
+        entry = self.directories.get(path)
+        if entry is not None and entry["mtime_ns"] is not None and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["dirs"], entry["pages"]
+
+        dirs, pages = scan_directory(path)
+        self.directories[path] = {"mtime_ns": trusted_mtime(stat), "dirs": dirs, "pages": pages}
+        return dirs, pages
+
+
+def find_markdown_files(content_path: str, index: DirectoryIndex = None) -> list[str]:
+    """Finds every markdown file under the content directory
+
+    Args:
+        content_path (str): The content directory, or a single markdown file
+        index (DirectoryIndex): Optional index of the directories listed by earlier builds
+
+    Returns:
+        list[str]: The sorted markdown file paths
+    """
+    if os.path.isfile(content_path):
+        return [content_path]
+
+    list_directory = index.list_directory if index is not None else scan_directory
+    files = []
+    pending = [content_path]
+    while pending:
+        directory = pending.pop()
+        dirs, pages = list_directory(directory)
+        files.extend(os.path.join(directory, name) for name in pages)
+        pending.extend(os.path.join(directory, name) for name in dirs)
+    return sorted(files)
+
+def page_dest_path(source: str, content_path: str, dest_path: str) -> str:
+    """Maps a markdown page in the content directory to its html file
+
+    Args:
+        source (str): The markdown file path
+        content_path (str): The content directory, or the page itself for a single page build
+        dest_path (str): The destination directory, or the page's output for a single page build
+
+    Returns:
+        str: The html file path
+    """
+    relative = os.path.relpath(source, content_path)
+    dest = dest_path if relative == "." else os.path.join(dest_path, relative)
+    return os.path.splitext(dest)[0] + ".html"
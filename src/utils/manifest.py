@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+
+from utils.depgraph import DependencyGraph, trusted_mtime
+
+MANIFEST_VERSION = 2
+
+def hash_file(path: str) -> str:
+    """Gets the sha256 hex digest of a file's contents
+
+    Args:
+        path (str): The file to be hashed
+
+    Returns:
+        str: The hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileHashCache:
+    """File hashes kept between builds, reused while a file's size and mtime are unchanged
+
+    Files modified within the racy window are hashed again on every call, as they can
+    be rewritten without their mtime moving.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, path: str) -> str:
+        """Gets the hash of a file, only reading it again when its size or mtime changed
+
+        Args:
+            path (str): The file to be hashed
+
+        Returns:
+            str: The hex digest of the file contents
+        """
+        stat = os.stat(path)
+        mtime = trusted_mtime(stat)
+        if mtime is None:
+            self._entries.pop(path, None)
+            return hash_file(path)
+        signature = (stat.st_size, mtime)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != signature:
+            entry = (signature, hash_file(path))
+            self._entries[path] = entry
+        return entry[1]
+
+
+class BuildManifest:
+    """On-disk record of every output written by a previous build
+
+    Each page entry is keyed by the markdown source path and stores the output path
+    and basepath used to render it. The dependency graph records the files every
+    output was built from, the page's markdown and the template. A page only needs
+    to be rendered again when its basepath or one of those files changed, or its
+    output went missing.
+    """
+
+    def __init__(self, path: str, pages: dict = None, hash_cache: FileHashCache = None, graph: dict = None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.hash_cache = hash_cache if hash_cache is not None else FileHashCache()
+        self.graph = DependencyGraph.from_dict(graph or {}, self.file_hash)
+        self._seen = set()
+
+    @classmethod
+    def load(cls, path: str, hash_cache: FileHashCache = None) -> "BuildManifest":
+        """Loads a manifest from disk, starting empty if it is missing or unreadable
+
+        Args:
+            path (str): The manifest file path
+            hash_cache (FileHashCache): Optional file hashes kept from earlier builds
+
+        Returns:
+            BuildManifest: The loaded manifest
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, hash_cache=hash_cache)
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path, hash_cache=hash_cache)
+        return cls(path, data.get("pages", {}), hash_cache, data.get("graph"))
+
+    def save(self):
+        """Writes the manifest to disk atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "pages": self.pages, "graph": self.graph.to_dict()}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def file_hash(self, path: str) -> str:
+        """Gets the hash of a file, only reading it again when its size or mtime changed
+
+        Args:
+            path (str): The file to be hashed
+
+        Returns:
+            str: The hex digest of the file contents
+        """
+        return self.hash_cache.get(path)
+
+    def is_fresh(self, source: str, template_path: str, dest_path: str, basepath: str) -> bool:
+        """Checks if a page's output is up to date and marks its source as seen
+
+        The source and template are snapshotted in the dependency graph, so call this
+        before the page is read.
+
+        Args:
+            source (str): The markdown source path
+            template_path (str): The template html file path
+            dest_path (str): The html output path
+            basepath (str): The basepath the page is rendered with
+
+        Returns:
+            bool: True if the page does not need to be rendered again
+        """
+        self._seen.add(source)
+        self.graph.snapshot(source)
+        self.graph.snapshot(template_path)
+        entry = self.pages.get(source)
+        if entry is None or entry.get("output") != dest_path or entry.get("basepath") != basepath:
+            return False
+        if self.graph.dependencies(dest_path) != [source, template_path]:
+            return False
+        return not self.graph.is_stale(dest_path) and os.path.exists(dest_path)
+
+    def record(self, source: str, template_path: str, dest_path: str, basepath: str):
+        """Records a freshly rendered page
+
+        Args:
+            source (str): The markdown source path
+            template_path (str): The template html file path
+            dest_path (str): The html output path
+            basepath (str): The basepath the page was rendered with
+        """
+        self._seen.add(source)
+        previous = self.pages.get(source)
+        if previous and previous.get("output") != dest_path:
+            remove_output(previous.get("output"))
+            self.graph.remove(previous.get("output"))
+
+        self.graph.record(dest_path, [source, template_path])
+        self.pages[source] = {
+            "basepath": basepath,
+            "output": dest_path,
+        }
+
+    def prune(self) -> list[str]:
+        """Removes the outputs of every page whose source was not seen this build
+
+        Returns:
+            list[str]: The output paths that were removed
+        """
+        removed = []
+        for source in sorted(set(self.pages) - self._seen):
+            output = self.pages.pop(source).get("output")
+            self.graph.remove(output)
+            if remove_output(output):
+                removed.append(output)
+        return removed
+
+
+def remove_output(path: str) -> bool:
+    """Removes a generated output and its directory if it is left empty
+
+    Args:
+        path (str): The output file path
+
+    Returns:
+        bool: True if the file was removed
+    """
+    if not path or not os.path.isfile(path):
+        return False
+
+    os.remove(path)
+    directory = os.path.dirname(path)
+    if directory and not os.listdir(directory):
+        os.rmdir(directory)
+    return True
@@ -0,0 +1,202 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+_NULL_STAGE = nullcontext()
+_active_profiler = None
+
+def set_active_profiler(profiler: "BuildProfiler | None"):
+    """Sets the profiler the pipeline stages report to, None turns profiling off
+
+    Args:
+        profiler (BuildProfiler | None): The profiler for this process
+    """
+    global _active_profiler
+    _active_profiler = profiler
+
+def active_profiler() -> "BuildProfiler | None":
+    """Gets the profiler the pipeline stages report to
+
+    Returns:
+        BuildProfiler | None: The active profiler, or None when profiling is off
+    """
+    return _active_profiler
+
+def stage(name: str):
+    """Times a pipeline stage on the active profiler
+
+    Args:
+        name (str): The stage name
+
+    Returns:
+        A context manager timing the stage, which does nothing when profiling is off
+    """
+    if _active_profiler is None:
+        return _NULL_STAGE
+    return _active_profiler.stage(name)
+
+def count_spans(count: int):
+    """Adds inline spans to the page the active profiler is timing
+
+    Args:
+        count (int): The number of spans rendered
+    """
+    if _active_profiler is not None:
+        _active_profiler.add_spans(count)
+
+
+class BuildProfiler:
+    """Records wall and CPU time per pipeline stage and per page
+
+    Stage times are self times: a nested stage's time is not counted again in
+    the stage around it, so the stage totals add up to the profiled time. Pages
+    and the stages directly inside them are also kept as Chrome trace events.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.pages = []
+        self.events = []
+        self._stack = []
+        self._record = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times a pipeline stage
+
+        Args:
+            name (str): The stage name
+        """
+        children = [0.0, 0.0]
+        self._stack.append(children)
+        start_ns = time.perf_counter_ns()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = (time.perf_counter_ns() - start_ns) / 1e9
+            cpu = time.process_time() - start_cpu
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += wall
+                self._stack[-1][1] += cpu
+
+            totals = self.stages.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += wall - children[0]
+            totals[1] += cpu - children[1]
+            totals[2] += 1
+            # Only stages directly inside a page become trace events, inner stages run per block
+            if len(self._stack) == 1:
+                self._add_event(name, "stage", start_ns, wall)
+
+    def add_spans(self, count: int):
+        """Adds inline spans to the page being timed, spans outside of a page are not counted
+
+        Args:
+            count (int): The number of spans rendered
+        """
+        if self._record is not None:
+            self._record["spans"] += count
+
+    @contextmanager
+    def page(self, path: str):
+        """Times the generation of one page
+
+        Args:
+            path (str): The markdown source path
+        """
+        record = {"path": path, "wall": 0.0, "cpu": 0.0, "spans": 0}
+        saved_stack, saved_record = self._stack, self._record
+        self._stack = [[0.0, 0.0]]
+        self._record = record
+        start_ns = time.perf_counter_ns()
+        start_cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall"] = (time.perf_counter_ns() - start_ns) / 1e9
+            record["cpu"] = time.process_time() - start_cpu
+            self._stack, self._record = saved_stack, saved_record
+            self.pages.append(record)
+            self._add_event(os.path.basename(path), "page", start_ns, record["wall"], {"path": path, "spans": record["spans"]})
+
+    def _add_event(self, name: str, category: str, start_ns: int, wall: float, args: dict = None):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": wall * 1e6,
+            "pid": os.getpid(),
+            "tid": 0,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def export(self) -> dict:
+        """Gets the recorded data and resets the profiler
+
+        Returns:
+            dict: The stages, pages and trace events recorded so far
+        """
+        data = {"stages": self.stages, "pages": self.pages, "events": self.events}
+        self.stages = {}
+        self.pages = []
+        self.events = []
+        return data
+
+    def merge(self, data: dict):
+        """Adds data exported by another profiler, such as one in a worker process
+
+        Args:
+            data (dict): The data returned by export()
+        """
+        for name, (wall, cpu, calls) in data["stages"].items():
+            totals = self.stages.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += calls
+        self.pages.extend(data["pages"])
+        self.events.extend(data["events"])
+
+    def summary(self, top: int = 10) -> str:
+        """Formats a report of the slowest stages and pages
+
+        Args:
+            top (int): The number of pages to list
+
+        Returns:
+            str: The report
+        """
+        wall = sum(page["wall"] for page in self.pages)
+        cpu = sum(page["cpu"] for page in self.pages)
+        spans = sum(page["spans"] for page in self.pages)
+        lines = [
+            f"Build profile: {len(self.pages)} pages, {wall:.3f} s wall, {cpu:.3f} s cpu, {spans} spans",
+            "",
+            "Slowest stages (self time):",
+            f"  {'stage':<16} {'wall ms':>10} {'cpu ms':>10} {'calls':>8} {'wall %':>7}",
+        ]
+        for name, (stage_wall, stage_cpu, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            share = stage_wall / wall * 100 if wall else 0.0
+            lines.append(f"  {name:<16} {stage_wall * 1000:>10.2f} {stage_cpu * 1000:>10.2f} {calls:>8} {share:>6.1f}%")
+
+        lines.extend([
+            "",
+            f"Slowest {min(top, len(self.pages))} pages:",
+            f"  {'wall ms':>10} {'cpu ms':>10} {'spans':>8}  path",
+        ])
+        for page in sorted(self.pages, key=lambda page: -page["wall"])[:top]:
+            lines.append(f"  {page['wall'] * 1000:>10.2f} {page['cpu'] * 1000:>10.2f} {page['spans']:>8}  {page['path']}")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str):
+        """Writes the pages and stages as Chrome trace event JSON (chrome://tracing, Perfetto)
+
+        Args:
+            path (str): The trace file path
+        """
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
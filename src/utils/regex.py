@@ -1,4 +1,21 @@
 import re
+from typing import Iterable, Iterator
+
+IMAGE_REGEX = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+LINK_REGEX = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+
+# Compiled once at import, the functions below run for every block and line of every page
+IMAGE_PATTERN = re.compile(IMAGE_REGEX)
+LINK_PATTERN = re.compile(LINK_REGEX)
+HEADING_PREFIX_PATTERN = re.compile(r"(#{1,6}\s)")
+ORDERED_LIST_PREFIX_PATTERN = re.compile(r"^\d+\.\s+")
+# The first line that is "# Title" once stripped, with the title in group 1
+TITLE_PATTERN = re.compile(r"^\s*?# (.*?\S)\s*?$", re.MULTILINE)
+# Headings and fenced code are the block types decided by how the block starts (and ends)
+BLOCK_START_PATTERN = re.compile(r"(?P<heading>#{1,6}) [^\n]|(?P<code>```.*```)\Z", re.DOTALL)
+
+HEADING = "heading"
+CODE = "code"
 
 def extract_markdown_images(text: str) -> list[str]:
     """Finds all markdown images within the given text
@@ -9,8 +26,7 @@ def extract_markdown_images(text: str) -> list[str]:
     Returns:
         list[str]: The markdown images in the text
     """
-    reg = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(reg, text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text: str) -> list[str]:
     """Finds all markdown links within the given text
@@ -21,8 +37,46 @@ def extract_markdown_links(text: str) -> list[str]:
     Returns:
         list[str]: The markdown links in the text
     """
-    reg = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(reg, text)
+    return LINK_PATTERN.findall(text)
+
+def iter_markdown_images(text: str) -> Iterator[re.Match]:
+    """Finds all markdown images within the given text along with their positions
+
+    Args:
+        text (str): The text to be checked for images
+
+    Returns:
+        Iterator[re.Match]: The image matches, with the alt text in group 1 and the url in group 2
+    """
+    return IMAGE_PATTERN.finditer(text)
+
+def iter_markdown_links(text: str) -> Iterator[re.Match]:
+    """Finds all markdown links within the given text along with their positions
+
+    Args:
+        text (str): The text to be checked for links
+
+    Returns:
+        Iterator[re.Match]: The link matches, with the link text in group 1 and the url in group 2
+    """
+    return LINK_PATTERN.finditer(text)
+
+def classify_block_start(block: str) -> tuple[str | None, int]:
+    """Checks if a markdown block is a heading or a code block with a single match
+
+    Args:
+        block (str): The markdown block to be checked
+
+    Returns:
+        tuple[str | None, int]: HEADING and the heading level, CODE and 0, or None and 0
+            when the block is neither
+    """
+    match = BLOCK_START_PATTERN.match(block)
+    if match is None:
+        return None, 0
+    if match.lastgroup == HEADING:
+        return HEADING, len(match.group(HEADING))
+    return CODE, 0
 
 def is_block_heading(block: str) -> bool:
     """Checks to see if a given markdown block is a heading
@@ -33,11 +87,7 @@ def is_block_heading(block: str) -> bool:
     Returns:
         bool: True if it is a heading block
     """
-    reg = r"^#{1,6} [^\n]"
-    match = re.match(reg, block)
-    if match:
-        return True
-    return False
+    return classify_block_start(block)[0] == HEADING
 
 def is_block_code(block: str) -> bool:
     """Checks to see if a given markdown block is a code block
@@ -48,11 +98,7 @@ def is_block_code(block: str) -> bool:
     Returns:
         bool: True if it is a code block
     """
-    reg = r"```(.*?)```"
-    match = re.fullmatch(reg, block, re.DOTALL)
-    if match:
-            return True
-    return False
+    return classify_block_start(block)[0] == CODE
 
 def get_heading(block: str) -> str | None:
     """Gets the heading from a markdown heading block
@@ -63,7 +109,7 @@ def get_heading(block: str) -> str | None:
     Returns:
         str | None: The heading format text found with the string (ex: "##### Heading 5" --> "##### ")
     """
-    match = re.match(r"^(#{1,6}\s)", block)
+    match = HEADING_PREFIX_PATTERN.match(block)
     if match:
         return match.group(1)
     return None
@@ -77,13 +123,14 @@ def remove_ordered_list_prefix(line: str) -> str:
     Returns:
         str: The line with the list number removed (ex: "1. item 1" --> "item 1")
     """
-    return re.sub(r"^\d+\.\s+", "", line)
+    return ORDERED_LIST_PREFIX_PATTERN.sub("", line, count=1)
 
-def extract_title(markdown: str) -> str:
+def extract_title(markdown: str | Iterable[str]) -> str:
     """Extracts the title from a markdown file (# Title)
 
     Args:
-        markdown (str): The markdown text document
+        markdown (str | Iterable[str]): The markdown text document, or its lines
+            (ex: an open file, which is only read up to the title)
 
     Raises:
         Exception: Markdown file missing header
@@ -91,12 +138,14 @@ def extract_title(markdown: str) -> str:
     Returns:
         str: Markdown title
     """
-    for line in markdown.splitlines():
-        line = line.strip()
-        match = re.match(r"^# (.+)", line)
+    if isinstance(markdown, str):
+        match = TITLE_PATTERN.search(markdown)
         if match:
             return match.group(1)
-        
-    raise Exception("Markdown file is missing header!")
-
+    else:
+        for line in markdown:
+            match = TITLE_PATTERN.match(line)
+            if match:
+                return match.group(1)
 
+    raise Exception("Markdown file is missing header!")
@@ -0,0 +1,165 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+def make_key(*parts: str) -> str:
+    """Builds a content-addressed cache key from text parts
+
+    Args:
+        *parts (str): The text the cached value depends on (ex: converter version and block text)
+
+    Returns:
+        str: The sha256 hex digest of the parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Two tier cache of rendered HTML fragments keyed by make_key
+
+    The memory tier is an LRU of at most max_entries fragments. The optional disk tier
+    stores one file per fragment under cache_dir and evicts the least recently used
+    files once they take up more than max_disk_bytes. Only the settings are pickled,
+    so every worker process gets its own memory tier while sharing the disk tier.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+
+    def __getstate__(self):
+        return {
+            "cache_dir": self.cache_dir,
+            "max_entries": self.max_entries,
+            "max_disk_bytes": self.max_disk_bytes,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get(self, key: str) -> str | None:
+        """Gets a cached fragment, checking memory before disk
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            str | None: The cached HTML fragment, or None on a miss
+        """
+        html = self._memory.get(key)
+        if html is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return html
+
+        html = self._read_disk(key)
+        if html is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._remember(key, html)
+        return html
+
+    def put(self, key: str, html: str):
+        """Stores a fragment in both tiers
+
+        Args:
+            key (str): The cache key
+            html (str): The HTML fragment
+        """
+        self._remember(key, html)
+        self._write_disk(key, html)
+
+    def clear_memory(self):
+        """Empties the memory tier"""
+        self._memory.clear()
+
+    def _remember(self, key: str, html: str):
+        self._memory[key] = html
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.html")
+
+    def _read_disk(self, key: str) -> str | None:
+        if self.cache_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+        except OSError:
+            return None
+
+        # Bump the mtime so eviction treats the file as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def _write_disk(self, key: str, html: str):
+        if self.cache_dir is None:
+            return
+
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        else:
+            self._disk_bytes += os.path.getsize(path)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _disk_entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".html"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self):
+        # Evict down to 90% of the limit so every write past it does not rescan the directory
+        target = self.max_disk_bytes * 0.9
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
@@ -1,8 +1,20 @@
 import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 
-from utils.convert import markdown_to_html_node
+from utils.context import BuildContext
+from utils.convert import iter_markdown_file_blocks, iter_markdown_html, markdown_to_html
+from utils.depgraph import DependencyGraph
+from utils.discovery import DirectoryIndex, find_markdown_files, page_dest_path
+from utils.manifest import BuildManifest
+from utils.profiling import BuildProfiler, active_profiler, set_active_profiler, stage
 from utils.regex import extract_title
+from utils.render_cache import RenderCache
+from utils.sync import sync_directory
+from utils.template import Template, load_template
+
+# Markdown files at least this large are memory mapped and streamed block by block instead of read whole
+STREAM_THRESHOLD_BYTES = 32 * 1024 * 1024
 
 def clear_directory(path: str) -> bool:
     """Clears all files and directories in a destination directory
@@ -39,8 +51,15 @@ def copy_files_to_dir(source: str, destination: str) -> bool:
     shutil.copytree(source, destination, dirs_exist_ok=True)
     return True
 
-def generate_public() -> bool:
-    """Clears the current public directory and copies static to public
+def generate_public(keep: set[str] = None, verify_hash: bool = False, link_mode: str = "copy", graph: DependencyGraph = None) -> bool:
+    """Syncs static to public, only copying changed files and removing orphaned ones
+
+    Args:
+        keep (set[str]): Paths in public that are not static files but must be kept,
+            such as the generated pages
+        verify_hash (bool): Also compare file contents when size and mtime match
+        link_mode (str): One of "copy", "hardlink" or "reflink"
+        graph (DependencyGraph): Optional dependency graph of the files in public
 
     Returns:
         bool: True if public generation successful
@@ -50,45 +69,240 @@ def generate_public() -> bool:
     public_path = os.path.join(project_dir, "docs")
     static_path = os.path.join(project_dir, "static")
 
-    return clear_directory(public_path) and copy_files_to_dir(static_path, public_path)
+    if not os.path.exists(static_path):
+        return False
+    sync_directory(static_path, public_path, keep, verify_hash, link_mode, graph)
+    return True
 
-def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str):
+def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str, cache: RenderCache = None, context: BuildContext = None):
     """Generates the HTML page for the website
 
     Args:
         from_path (str): The markdown file path to be rendered on the webpage
         template_path (str): The template html file path
         dest_path (str): The path to the html file
+        basepath (str): The root path the site is hosted under
+        cache (RenderCache): Optional cache of rendered markdown blocks
+        context (BuildContext): Optional state shared by the pages of a build. Its
+            template is used instead of looking the template up for this page.
     """
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, "r") as f:
-        markdown_contents = f.read()
+    template = context.template if context is not None else None
+    profiler = active_profiler()
+    if profiler is None:
+        _render_page(from_path, template_path, dest_path, basepath, cache, template)
+        return
+
+    with profiler.page(from_path):
+        _render_page(from_path, template_path, dest_path, basepath, cache, template)
+
+def _render_page(from_path: str, template_path: str, dest_path: str, basepath: str, cache: RenderCache = None, template: Template = None):
+    """Renders a markdown file into the template and writes it out
+
+    Args:
+        from_path (str): The markdown file path to be rendered on the webpage
+        template_path (str): The template html file path
+        dest_path (str): The path to the html file
+        basepath (str): The root path the site is hosted under
+        cache (RenderCache): Optional cache of rendered markdown blocks
+        template (Template): The compiled template, loaded from template_path when not given
+    """
+    if os.path.getsize(from_path) >= STREAM_THRESHOLD_BYTES:
+        _stream_page(from_path, template_path, dest_path, basepath, cache, template)
+        return
+
+    with stage("read"):
+        with open(from_path, "r") as f:
+            markdown_contents = f.read()
+
+    if template is None:
+        with stage("template"):
+            template = load_template(template_path, basepath)
+
+    with stage("convert"):
+        html = markdown_to_html(markdown_contents, cache, basepath)
+    with stage("title"):
+        title = extract_title(markdown_contents)
+
+    # The template's links are pointed at the basepath when it is compiled and the
+    # page's links when they are converted, so the content goes straight to the file
+    with stage("write"):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w") as f:
+            template.write(f, {"Title": title, "Content": html})
 
-    with open(template_path, "r") as f:
-        template_contents = f.read()
+def render_markdown_page(markdown_contents: str, template_path: str, basepath: str, cache: RenderCache = None) -> str:
+    """Renders markdown into the template without reading or writing any file
 
-    html = markdown_to_html_node(markdown_contents)
-    title = extract_title(markdown_contents)
+    Args:
+        markdown_contents (str): The markdown of the page
+        template_path (str): The template html file path
+        basepath (str): The root path the site is hosted under
+        cache (RenderCache): Optional cache of rendered markdown blocks
+
+    Returns:
+        str: The html of the page, the same as generate_page writes
+    """
+    with stage("template"):
+        template = load_template(template_path, basepath)
 
-    template_contents = template_contents.replace("{{ Title }}", title)
-    content = template_contents.replace("{{ Content }}", html.to_html())
-    content = content.replace('href="/', f'href="{basepath}')
-    content = content.replace('src="/', f'src="{basepath}')
+    with stage("convert"):
+        html = markdown_to_html(markdown_contents, cache, basepath)
+    with stage("title"):
+        title = extract_title(markdown_contents)
+    return template.render({"Title": title, "Content": html})
 
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as f:
-        f.write(content)
+def _stream_page(from_path: str, template_path: str, dest_path: str, basepath: str, cache: RenderCache = None, template: Template = None):
+    """Renders a large markdown file into the template one block at a time
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str):
+    The file is read twice, once up to its title and once through a memory map
+    while the HTML is written, decoding one block at a time, so memory use does
+    not grow with the size of the file.
+
+    Args:
+        from_path (str): The markdown file path to be rendered on the webpage
+        template_path (str): The template html file path
+        dest_path (str): The path to the html file
+        basepath (str): The root path the site is hosted under
+        cache (RenderCache): Optional cache of rendered markdown blocks
+        template (Template): The compiled template, loaded from template_path when not given
+    """
+    if template is None:
+        with stage("template"):
+            template = load_template(template_path, basepath)
+
+    with stage("title"):
+        with open(from_path, "r") as f:
+            title = extract_title(f)
+
+    with stage("write"):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w") as f:
+            content = iter_markdown_html(iter_markdown_file_blocks(from_path), cache, basepath)
+            template.write(f, {"Title": title, "Content": content})
+
+def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str, manifest: BuildManifest = None, cache: RenderCache = None, context: BuildContext = None):
     """Recursively generates all html pages in the content 
 
     Args:
         dir_path_content (str): The directory path to the markdown content to be converted
         template_path (str): The path to the template index file
         dest_dir_path (str): The directory for the converted html files
+        manifest (BuildManifest): Build manifest for incremental builds. Pages that are
+            unchanged since they were recorded are skipped.
+        cache (RenderCache): Optional cache of rendered markdown blocks
+        context (BuildContext): The state shared by every page of the build. When given
+            its pages, template, manifest and cache are used, otherwise one is created
+            from the other arguments for the whole tree.
+    """
+    if context is None:
+        context = BuildContext(dir_path_content, template_path, dest_dir_path, basepath, manifest, cache)
+    manifest = context.manifest
+
+    for source, dest_path in context.pages():
+        if manifest is not None and manifest.is_fresh(source, template_path, dest_path, basepath):
+            continue
+        generate_page(source, template_path, dest_path, basepath, context.cache, context)
+        if manifest is not None:
+            manifest.record(source, template_path, dest_path, basepath)
+
+def collect_pages(dir_path_content: str, dest_dir_path: str, index: DirectoryIndex = None) -> list[tuple[str, str]]:
+    """Lists every markdown page in the content with its html destination
+
+    Args:
+        dir_path_content (str): The directory path to the markdown content to be converted
+        dest_dir_path (str): The directory for the converted html files
+        index (DirectoryIndex): Optional index of the directories listed by earlier builds
+
+    Returns:
+        list[tuple[str, str]]: The (source, destination) path pairs, sorted by source
+    """
+    return [
+        (source, page_dest_path(source, dir_path_content, dest_dir_path))
+        for source in find_markdown_files(dir_path_content, index)
+    ]
+
+_worker_cache = None
+
+def init_worker(cache: RenderCache, profile: bool = False):
+    """Sets up the render cache and profiler each worker process keeps for all of its pages
+
+    Used as the initializer of every process pool that renders markdown.
+
+    Args:
+        cache (RenderCache): The render cache settings, or None to render without a cache
+        profile (bool): Whether to profile the pages rendered by the worker
+    """
+    global _worker_cache
+    _worker_cache = cache
+    set_active_profiler(BuildProfiler() if profile else None)
+
+def worker_cache() -> RenderCache | None:
+    """Gets the render cache init_worker set up for this worker process
+
+    Returns:
+        RenderCache | None: The render cache, or None to render without a cache
+    """
+    return _worker_cache
+
+def _generate_page_job(job: tuple[str, str, str, str]) -> dict | None:
+    """Worker entry point that generates one page, naming the page if it fails
+
+    Args:
+        job (tuple[str, str, str, str]): The generate_page arguments
+
+    Raises:
+        Exception: The page failed to generate
+
+    Returns:
+        dict | None: The profile of the page when profiling, to be merged by the parent process
+    """
+    from_path = job[0]
+    try:
+        generate_page(*job, cache=_worker_cache)
+    except Exception as e:
+        raise Exception(f"Failed to generate page {from_path}: {e}") from e
+
+    profiler = active_profiler()
+    return profiler.export() if profiler is not None else None
+
+def generate_pages_parallel(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str, jobs: int, manifest: BuildManifest = None, chunksize: int = None, cache: RenderCache = None, index: DirectoryIndex = None):
+    """Generates all html pages in the content using a pool of worker processes
+
+    Args:
+        dir_path_content (str): The directory path to the markdown content to be converted
+        template_path (str): The path to the template index file
+        dest_dir_path (str): The directory for the converted html files
+        basepath (str): The root path the site is hosted under
+        jobs (int): The number of worker processes
+        manifest (BuildManifest): Build manifest for incremental builds
+        chunksize (int): The number of pages sent to a worker at a time. Defaults to
+            splitting the pages into about four chunks per worker.
+        cache (RenderCache): Optional cache of rendered markdown blocks. Each worker gets its
+            own memory tier and shares the disk tier.
+        index (DirectoryIndex): Optional index of the directories listed by earlier builds
+
+    Raises:
+        Exception: A page failed to generate. The first failing page in source order is reported.
     """
-    if os.path.isfile(dir_path_content):
-        generate_page(f"{dir_path_content}", template_path, f"{dest_dir_path}".replace("md", "html"), basepath)
-    else:
-        for item in os.listdir(dir_path_content):
-            generate_pages_recursive(f"{dir_path_content}/{item}", template_path, f"{dest_dir_path}/{item}", basepath)
\ No newline at end of file
+    pages = collect_pages(dir_path_content, dest_dir_path, index)
+    if manifest is not None:
+        pages = [
+            (source, dest) for source, dest in pages
+            if not manifest.is_fresh(source, template_path, dest, basepath)
+        ]
+    if not pages:
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(pages) // (jobs * 4))
+    page_jobs = [(source, template_path, dest, basepath) for source, dest in pages]
+
+    profiler = active_profiler()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache, profiler is not None)) as executor:
+        results = executor.map(_generate_page_job, page_jobs, chunksize=chunksize)
+        for (source, dest), profile in zip(pages, results):
+            if manifest is not None:
+                manifest.record(source, template_path, dest, basepath)
+            if profile is not None:
+                profiler.merge(profile)
@@ -0,0 +1,148 @@
+import os
+import shutil
+
+from utils.depgraph import DependencyGraph
+from utils.manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# Linux ioctl that clones a file's extents (FICLONE), supported by btrfs, xfs and others
+FICLONE = 0x40049409
+
+def is_file_unchanged(source: str, destination: str, verify_hash: bool = False) -> bool:
+    """Checks if a destination file already matches its source
+
+    Args:
+        source (str): The source file
+        destination (str): The synced copy of the source
+        verify_hash (bool): Also compare file contents when size and mtime match
+
+    Returns:
+        bool: True if the destination does not need to be updated
+    """
+    try:
+        source_stat = os.stat(source)
+        dest_stat = os.stat(destination)
+    except OSError:
+        return False
+
+    if (source_stat.st_dev, source_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    if source_stat.st_size != dest_stat.st_size or source_stat.st_mtime_ns != dest_stat.st_mtime_ns:
+        return False
+    return not verify_hash or hash_file(source) == hash_file(destination)
+
+def reflink_file(source: str, destination: str):
+    """Clones a file with a copy-on-write reflink, keeping its metadata
+
+    Args:
+        source (str): The file to be cloned
+        destination (str): The path of the clone
+
+    Raises:
+        OSError: The platform or filesystem does not support reflinks
+    """
+    if fcntl is None:
+        raise OSError("Reflinks are not supported on this platform")
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, destination)
+
+def place_file(source: str, destination: str, link_mode: str = "copy"):
+    """Puts a copy of the source at the destination, replacing what is there
+
+    Hardlinks and reflinks fall back to a normal copy when the filesystem
+    does not support them, such as when source and destination are on different devices.
+
+    Args:
+        source (str): The source file
+        destination (str): The destination file
+        link_mode (str): One of "copy", "hardlink" or "reflink"
+    """
+    if link_mode not in LINK_MODES:
+        raise Exception(f"Invalid link mode received: {link_mode}")
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    if os.path.lexists(destination):
+        os.remove(destination)
+
+    try:
+        if link_mode == "hardlink":
+            os.link(source, destination)
+            return
+        if link_mode == "reflink":
+            reflink_file(source, destination)
+            return
+    except OSError:
+        if os.path.lexists(destination):
+            os.remove(destination)
+    shutil.copy2(source, destination)
+
+def sync_directory(source: str, destination: str, keep: set[str] = None, verify_hash: bool = False, link_mode: str = "copy", graph: DependencyGraph = None) -> tuple[list[str], list[str]]:
+    """Makes destination mirror source, only touching files that differ
+
+    Files are compared by size and mtime (and optionally their hash) and only changed
+    files are copied. Destination files with no source are deleted unless they are in keep.
+    With a dependency graph every synced file is recorded as built from its source, and
+    sources unchanged since they were recorded are not hashed again.
+
+    Args:
+        source (str): The source directory
+        destination (str): The directory to be synced
+        keep (set[str]): Destination paths that are not in source but must not be deleted
+        verify_hash (bool): Also compare file contents when size and mtime match
+        link_mode (str): One of "copy", "hardlink" or "reflink"
+        graph (DependencyGraph): Optional dependency graph of the destination's files
+
+    Returns:
+        tuple[list[str], list[str]]: The sorted destination paths that were copied, and the ones that were removed
+    """
+    keep = {os.path.normpath(path) for path in keep or ()}
+    synced = set()
+    copied = []
+    for root, _, files in os.walk(source):
+        relative_root = os.path.relpath(root, source)
+        for name in files:
+            source_path = os.path.join(root, name)
+            dest_path = os.path.normpath(os.path.join(destination, relative_root, name))
+            synced.add(dest_path)
+            if graph is not None and graph.dependencies(dest_path) == [source_path] and not graph.is_stale(dest_path):
+                # The source still has its recorded hash, so only the copy is hashed to verify it
+                unchanged = is_file_unchanged(source_path, dest_path) and (
+                    not verify_hash or hash_file(dest_path) == graph.inputs[source_path]["hash"]
+                )
+            else:
+                unchanged = is_file_unchanged(source_path, dest_path, verify_hash)
+                if unchanged and graph is not None:
+                    graph.record(dest_path, [source_path])
+            if unchanged:
+                continue
+            if graph is not None:
+                graph.snapshot(source_path)
+            place_file(source_path, dest_path, link_mode)
+            copied.append(dest_path)
+            if graph is not None:
+                graph.record(dest_path, [source_path])
+
+    removed = []
+    for root, dirs, files in os.walk(destination, topdown=False):
+        for name in files:
+            dest_path = os.path.normpath(os.path.join(root, name))
+            if dest_path in synced or dest_path in keep:
+                continue
+            os.remove(dest_path)
+            removed.append(dest_path)
+            if graph is not None:
+                graph.remove(dest_path)
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            if not os.path.islink(dir_path) and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+
+    return sorted(copied), sorted(removed)
@@ -0,0 +1,131 @@
+import os
+import re
+from htmlnode import HTMLNode
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class Template:
+    """A template parsed into literal chunks and the named placeholder slots between them
+
+    chunks[0] comes before slots[0], chunks[1] before slots[1], and the final chunk
+    comes after the last slot, so there is always one more chunk than there are slots.
+    """
+
+    def __init__(self, chunks: list[str], slots: list[str]):
+        if len(chunks) != len(slots) + 1:
+            raise Exception("Template must have exactly one more chunk than slots")
+        self.chunks = chunks
+        self.slots = slots
+
+    @property
+    def placeholders(self) -> set[str]:
+        """The names of every placeholder in the template"""
+        return set(self.slots)
+
+    def render(self, values: dict) -> str:
+        """Renders the template with a single join
+
+        Args:
+            values (dict): The text for each placeholder name
+
+        Raises:
+            Exception: A placeholder in the template has no value
+
+        Returns:
+            str: The rendered template
+        """
+        parts = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            if slot not in values:
+                raise Exception(f"Missing value for template placeholder '{slot}'")
+            parts.append(values[slot])
+            parts.append(chunk)
+        return "".join(parts)
+
+    def write(self, fp, values: dict):
+        """Streams the rendered template to a writable file-like object
+
+        Args:
+            fp: The file-like object the page is written to
+            values (dict): The text, HTMLNode or iterable of text chunks for each
+                placeholder name. Nodes are streamed with write_html instead of being
+                serialized up front, and chunks are written as they are produced
+                (so a chunk iterator can only fill one placeholder).
+
+        Raises:
+            Exception: A placeholder in the template has no value
+        """
+        missing = self.placeholders - values.keys()
+        if missing:
+            raise Exception(f"Missing value for template placeholder '{sorted(missing)[0]}'")
+
+        fp.write(self.chunks[0])
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = values[slot]
+            if isinstance(value, HTMLNode):
+                value.write_html(fp)
+            elif isinstance(value, str):
+                fp.write(value)
+            else:
+                fp.writelines(value)
+            fp.write(chunk)
+
+
+def rewrite_basepath(text: str, basepath: str) -> str:
+    """Points root relative href and src attributes at the basepath
+
+    Args:
+        text (str): The html text to be rewritten
+        basepath (str): The root path the site is hosted under
+
+    Returns:
+        str: The html with root relative urls moved under the basepath
+    """
+    if basepath == "/":
+        return text
+    text = text.replace('href="/', f'href="{basepath}')
+    return text.replace('src="/', f'src="{basepath}')
+
+def compile_template(text: str, basepath: str = "/") -> Template:
+    """Parses template text into a Template, rewriting the template's own links once
+
+    Args:
+        text (str): The template text with {{ Name }} placeholders
+        basepath (str): The root path the site is hosted under
+
+    Returns:
+        Template: The compiled template
+    """
+    chunks = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        chunks.append(rewrite_basepath(text[position:match.start()], basepath))
+        slots.append(match.group(1))
+        position = match.end()
+    chunks.append(rewrite_basepath(text[position:], basepath))
+    return Template(chunks, slots)
+
+_template_cache = {}
+
+def load_template(path: str, basepath: str = "/") -> Template:
+    """Loads a compiled template, reusing the cached one until the file is modified
+
+    Args:
+        path (str): The template html file path
+        basepath (str): The root path the site is hosted under
+
+    Returns:
+        Template: The compiled template
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = (path, basepath)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, "r") as f:
+        template = compile_template(f.read(), basepath)
+    _template_cache[key] = (version, template)
+    return template
@@ -0,0 +1,165 @@
+import functools
+import os
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.discovery import page_dest_path
+from utils.manifest import remove_output
+from utils.render_cache import RenderCache
+from utils.site_gen import generate_page, generate_pages_recursive
+from utils.sync import sync_directory
+
+def snapshot(path: str) -> dict[str, tuple[int, int]]:
+    """Records the mtime and size of every file under a path
+
+    Args:
+        path (str): A file or directory to be scanned
+
+    Returns:
+        dict[str, tuple[int, int]]: The (mtime_ns, size) of each file path
+    """
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return {path: (stat.st_mtime_ns, stat.st_size)}
+
+    files = {}
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def diff_snapshots(old: dict, new: dict) -> tuple[list[str], list[str]]:
+    """Compares two snapshots
+
+    Args:
+        old (dict): The previous snapshot
+        new (dict): The current snapshot
+
+    Returns:
+        tuple[list[str], list[str]]: The sorted changed or added paths, and the sorted removed paths
+    """
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+class SiteWatcher:
+    """Keeps a built site up to date by polling its inputs for changes
+
+    Changed markdown files are re-rendered on their own, changed static files are
+    copied on their own, and a changed template re-renders every page.
+    """
+
+    def __init__(self, content_dir: str, static_dir: str, template_path: str, dest_dir: str, basepath: str = "/", cache: RenderCache = None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.cache = cache
+        self._snapshots = {}
+
+    def _take_snapshots(self) -> dict[str, dict]:
+        return {
+            "content": snapshot(self.content_dir),
+            "static": snapshot(self.static_dir) if os.path.exists(self.static_dir) else {},
+            "template": snapshot(self.template_path),
+        }
+
+    def page_dest_path(self, source: str) -> str:
+        """Gets the html output path for a markdown source
+
+        Args:
+            source (str): The markdown source path
+
+        Returns:
+            str: The html output path
+        """
+        return page_dest_path(source, self.content_dir, self.dest_dir)
+
+    def static_dest_path(self, source: str) -> str:
+        """Gets the output path for a static file
+
+        Args:
+            source (str): The static file path
+
+        Returns:
+            str: The output path
+        """
+        return os.path.join(self.dest_dir, os.path.relpath(source, self.static_dir))
+
+    def build(self):
+        """Runs a full build and records the state of every input"""
+        self._snapshots = self._take_snapshots()
+        os.makedirs(self.dest_dir, exist_ok=True)
+        pages = {self.page_dest_path(source) for source in self._snapshots["content"] if source.endswith(".md")}
+        if os.path.exists(self.static_dir):
+            sync_directory(self.static_dir, self.dest_dir, keep=pages)
+        generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, self.basepath, cache=self.cache)
+
+    def poll(self) -> list[str]:
+        """Rebuilds the outputs affected by inputs changed since the last build or poll
+
+        Returns:
+            list[str]: The output paths that were written or removed
+        """
+        old = self._snapshots
+        new = self._take_snapshots()
+        self._snapshots = new
+        updated = []
+
+        template_changed, _ = diff_snapshots(old["template"], new["template"])
+        changed, removed = diff_snapshots(old["content"], new["content"])
+        if template_changed:
+            changed = sorted(new["content"])
+
+        for source in changed:
+            if not source.endswith(".md"):
+                continue
+            dest = self.page_dest_path(source)
+            try:
+                generate_page(source, self.template_path, dest, self.basepath, self.cache)
+            except Exception as e:
+                # Keep watching, the page is rebuilt on its next change
+                print(f"Failed to generate page {source}: {e}")
+                continue
+            updated.append(dest)
+        for source in removed:
+            if source.endswith(".md") and remove_output(self.page_dest_path(source)):
+                updated.append(self.page_dest_path(source))
+
+        changed, removed = diff_snapshots(old["static"], new["static"])
+        for source in changed:
+            dest = self.static_dest_path(source)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copy2(source, dest)
+            updated.append(dest)
+        for source in removed:
+            if remove_output(self.static_dest_path(source)):
+                updated.append(self.static_dest_path(source))
+
+        return updated
+
+
+def start_server(directory: str, port: int, host: str = "") -> ThreadingHTTPServer:
+    """Serves a directory over HTTP from a background thread
+
+    Args:
+        directory (str): The directory to be served
+        port (int): The port to listen on, 0 picks a free port
+        host (str): The address to bind, all interfaces by default
+
+    Returns:
+        ThreadingHTTPServer: The running server, stop it with shutdown()
+    """
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
@@ -138,3 +139,130 @@ class TestHTMLNode(unittest.TestCase):
             "<div>My text</div>"
         )
 
+    def test_iter_html_matches_to_html(self):
+        parent_node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "text "), LeafNode("b", "bold")]),
+                ParentNode("ul", [ParentNode("li", [LeafNode("a", "link", {"href": "/"})])]),
+            ],
+        )
+        chunks = list(parent_node.iter_html())
+        self.assertEqual(chunks[0], "<div>")
+        self.assertEqual(chunks[1], "<p>text <b>bold</b></p>")
+        self.assertEqual(chunks[-1], "</div>")
+        self.assertEqual("".join(chunks), parent_node.to_html())
+
+    def test_write_html(self):
+        parent_node = ParentNode("div", [ParentNode("span", [LeafNode("b", "grandchild")])])
+        fp = io.StringIO()
+        parent_node.write_html(fp)
+        self.assertEqual(fp.getvalue(), "<div><span><b>grandchild</b></span></div>")
+
+    def test_write_html_leaf(self):
+        fp = io.StringIO()
+        LeafNode("p", "Paragraph").write_html(fp)
+        self.assertEqual(fp.getvalue(), "<p>Paragraph</p>")
+
+    def test_write_html_invalid_child(self):
+        parent_node = ParentNode("div", [LeafNode("p", None)])
+        with self.assertRaises(ValueError):
+            parent_node.write_html(io.StringIO())
+
+    def test_nodes_have_no_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "bold"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_to_html_cached(self):
+        node = ParentNode("div", [LeafNode("b", "bold")])
+        html = node.to_html()
+        self.assertIs(node.to_html(), html)
+        self.assertEqual(node.cached_html(), "<div><b>bold</b></div>")
+
+    def test_only_serialized_node_keeps_html(self):
+        child = ParentNode("p", [LeafNode("b", "bold")])
+        node = ParentNode("div", [child])
+        node.to_html()
+        self.assertIsNone(child.cached_html())
+        self.assertEqual(child.to_html(), "<p><b>bold</b></p>")
+        self.assertEqual(child.cached_html(), "<p><b>bold</b></p>")
+
+    def test_clear_cached_html(self):
+        node = ParentNode("div", [LeafNode("b", "bold")])
+        html = node.to_html()
+        node.clear_cached_html()
+        self.assertIsNone(node.cached_html())
+        self.assertIsNot(node.to_html(), html)
+
+    def test_invalid_html_not_cached(self):
+        node = ParentNode("div", [LeafNode("b", None)])
+        self.assertIsInstance(node.to_html(), ValueError)
+        self.assertIsNone(node.cached_html())
+
+    def test_cache_invalidated_by_setters(self):
+        child = LeafNode("a", "link", {"href": "/"})
+        node = ParentNode("div", [child])
+        node.to_html()
+        child.value = "home"
+        self.assertEqual(node.to_html(), '<div><a href="/">home</a></div>')
+        child.props = {"href": "/blog"}
+        self.assertEqual(node.to_html(), '<div><a href="/blog">home</a></div>')
+        node.children = [LeafNode(None, "text")]
+        self.assertEqual(node.to_html(), "<div>text</div>")
+        node.tag = "p"
+        self.assertEqual(node.to_html(), "<p>text</p>")
+
+    def test_cache_invalidated_in_place(self):
+        child = LeafNode("a", "link", {"href": "/"})
+        node = ParentNode("div", [child])
+        node.to_html()
+        child.props["href"] = "/blog"
+        self.assertEqual(node.to_html(), '<div><a href="/blog">link</a></div>')
+        node.children.append(LeafNode("b", "bold"))
+        self.assertEqual(node.to_html(), '<div><a href="/blog">link</a><b>bold</b></div>')
+        del node.children[0]
+        self.assertEqual(node.to_html(), "<div><b>bold</b></div>")
+
+    def test_children_and_props_copied(self):
+        children = [LeafNode("b", "bold")]
+        props = {"class": "x"}
+        node = ParentNode("div", children, props)
+        children.append(LeafNode("i", "italic"))
+        props["id"] = "y"
+        self.assertEqual(len(node.children), 1)
+        self.assertEqual(node.props, {"class": "x"})
+
+    def test_lazy_children(self):
+        calls = []
+        def make_children():
+            calls.append(1)
+            return [LeafNode("b", "bold")]
+
+        node = ParentNode.lazy("p", make_children)
+        self.assertFalse(node.is_materialized())
+        self.assertEqual(node.tag, "p")
+        self.assertEqual(calls, [])
+        self.assertEqual(node.to_html(), "<p><b>bold</b></p>")
+        self.assertEqual(node.children[0].value, "bold")
+        self.assertTrue(node.is_materialized())
+        self.assertEqual(calls, [1])
+
+    def test_lazy_children_failure_retried(self):
+        def make_children():
+            raise Exception("Invalid syntax")
+
+        node = ParentNode.lazy("p", make_children)
+        for _ in range(2):
+            with self.assertRaisesRegex(Exception, "Invalid syntax"):
+                node.to_html()
+        self.assertFalse(node.is_materialized())
+
+    def test_lazy_children_repr(self):
+        node = ParentNode.lazy("p", lambda: self.fail("children should not be created"))
+        self.assertIn("Children: None", repr(node))
+        self.assertFalse(node.is_materialized())
+
+    def test_lazy_children_replaced(self):
+        node = ParentNode.lazy("p", lambda: self.fail("children should not be created"))
+        node.children = [LeafNode(None, "text")]
+        self.assertEqual(node.to_html(), "<p>text</p>")
@@ -0,0 +1,106 @@
+import io
+import os
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from utils import async_build, site_gen
+from utils.async_build import generate_pages_async
+from utils.manifest import BuildManifest
+from utils.profiling import BuildProfiler, set_active_profiler
+from utils.site_gen import generate_pages_recursive
+from test_utils import TempDirTestCase
+
+
+class TestGeneratePagesAsync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        for name in ("a", "b", "c"):
+            os.makedirs(os.path.join(self.content, "blog", name))
+            self.write(f"content/blog/{name}/index.md", f"# {name}\n\nSome **bold** [link](/{name})\n\n- a\n- list")
+        self.write("content/index.md", "# Home\n\n![img](/logo.png)")
+        self.template = self.write("template.html", '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def test_matches_recursive(self):
+        expected = os.path.join(self.root, "expected")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, expected, "/site/")
+            for render_jobs in (0, 2):
+                out = os.path.join(self.root, f"async{render_jobs}")
+                generate_pages_async(self.content, self.template, out, "/site/", readers=2, writers=2, render_jobs=render_jobs, queue_size=1)
+                self.assertEqual(self.read_tree(out), self.read_tree(expected))
+        self.assertEqual(len(self.read_tree(expected)), 4)
+
+    def test_incremental(self):
+        out = os.path.join(self.root, "out")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        with redirect_stdout(io.StringIO()):
+            generate_pages_async(self.content, self.template, out, "/", manifest)
+        self.assertEqual(len(manifest.pages), 4)
+
+        self.write("content/blog/b/index.md", "# B\n\nChanged")
+        manifest.save()
+        manifest = BuildManifest.load(manifest.path)
+        with redirect_stdout(io.StringIO()) as output:
+            generate_pages_async(self.content, self.template, out, "/", manifest)
+        self.assertEqual(output.getvalue().count("Generating page"), 1)
+        self.assertIn("Changed", self.read_tree(out)["blog/b/index.html"])
+
+    def test_manifest_used_from_one_thread(self):
+        out = os.path.join(self.root, "out")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        with redirect_stdout(io.StringIO()):
+            generate_pages_async(self.content, self.template, out, "/", manifest)
+        manifest.save()
+
+        self.write("content/new.md", "# New")
+        manifest = BuildManifest.load(manifest.path)
+        threads = set()
+        def on_thread(method):
+            def call(*args):
+                threads.add(threading.get_ident())
+                return method(*args)
+            return call
+        manifest.graph.changed_inputs = on_thread(manifest.graph.changed_inputs)
+        manifest.graph.record = on_thread(manifest.graph.record)
+        with redirect_stdout(io.StringIO()):
+            generate_pages_async(self.content, self.template, out, "/", manifest, readers=4, writers=4)
+        self.assertEqual(threads, {threading.get_ident()})
+        self.assertIn("content/new.md", {os.path.relpath(source, self.root) for source in manifest.pages})
+
+    def test_profiled_large_pages(self):
+        for name in ("d", "e", "f"):
+            self.write(f"content/{name}.md", f"# {name}\n\n" + "\n\n".join(f"Paragraph **{i}** of [text](/{i})" for i in range(2000)))
+        expected = os.path.join(self.root, "expected")
+        out = os.path.join(self.root, "out")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, expected, "/")
+
+        threshold = site_gen.STREAM_THRESHOLD_BYTES
+        profiler = BuildProfiler()
+        try:
+            async_build.STREAM_THRESHOLD_BYTES = site_gen.STREAM_THRESHOLD_BYTES = 20_000
+            set_active_profiler(profiler)
+            with redirect_stdout(io.StringIO()):
+                generate_pages_async(self.content, self.template, out, "/", readers=4, writers=4)
+        finally:
+            set_active_profiler(None)
+            async_build.STREAM_THRESHOLD_BYTES = site_gen.STREAM_THRESHOLD_BYTES = threshold
+        self.assertEqual(self.read_tree(out), self.read_tree(expected))
+        self.assertEqual(len(profiler.pages), 7)
+
+    def test_error_names_file(self):
+        bad = self.write("content/blog/b/index.md", "No title here")
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(Exception) as ctx:
+                generate_pages_async(self.content, self.template, os.path.join(self.root, "out"), "/")
+        self.assertIn(bad, str(ctx.exception))
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(Exception):
+            generate_pages_async(self.content, self.template, os.path.join(self.root, "out"), "/", readers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
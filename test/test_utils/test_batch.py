@@ -0,0 +1,56 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+from utils.batch import markdown_to_html_batch
+from utils.convert import markdown_to_html_node
+from utils.render_cache import RenderCache
+
+
+class TestMarkdownToHtmlBatch(unittest.TestCase):
+    def setUp(self):
+        self.documents = [
+            f"Comment {i} with **bold** and a [link](/page/{i})\n\n- item\n- list"
+            for i in range(10)
+        ]
+        self.expected = [markdown_to_html_node(document, basepath="/site/").to_html() for document in self.documents]
+
+    def test_matches_single_documents(self):
+        self.assertEqual(list(markdown_to_html_batch(self.documents, basepath="/site/")), self.expected)
+
+    def test_worker_processes_keep_order(self):
+        results = markdown_to_html_batch(iter(self.documents), basepath="/site/", jobs=2, chunksize=3)
+        self.assertEqual(list(results), self.expected)
+
+    def test_paths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp, "snippet.md")
+            path.write_text(self.documents[0])
+            documents = [path, self.documents[1]]
+            for jobs in (1, 2):
+                self.assertEqual(list(markdown_to_html_batch(documents, basepath="/site/", jobs=jobs)), self.expected[:2])
+
+    def test_shared_cache(self):
+        cache = RenderCache()
+        list(markdown_to_html_batch(["Shared footer", "Shared footer"], cache))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_empty_document(self):
+        self.assertEqual(list(markdown_to_html_batch(["", "text"])), ["<div></div>", "<div><p>text</p></div>"])
+
+    def test_error_names_document(self):
+        documents = ["fine", "fine", pathlib.Path(os.devnull, "missing.md")]
+        for jobs in (1, 2):
+            with self.assertRaises(Exception) as ctx:
+                list(markdown_to_html_batch(documents, jobs=jobs, chunksize=1))
+            self.assertIn("Failed to render document 2", str(ctx.exception))
+            self.assertIn("missing.md", str(ctx.exception))
+
+    def test_invalid_jobs(self):
+        with self.assertRaises(Exception):
+            list(markdown_to_html_batch(self.documents, jobs=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
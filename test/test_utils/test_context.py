@@ -0,0 +1,50 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from utils.context import BuildContext
+from utils.manifest import BuildManifest
+from utils.site_gen import generate_pages_recursive
+from test_utils import TempDirTestCase
+
+
+class TestBuildContext(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "cmd", "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.template = self.write("template.html", '<a href="/">{{ Title }}</a>{{ Content }}')
+        self.write("cmd/content/index.md", "# Home\n\n[Blog](/blog/post)")
+        self.write("cmd/content/blog/post.md", "# Post\n\nText")
+
+    def test_dest_path(self):
+        context = BuildContext(self.content, self.template, os.path.join(self.root, "docs"))
+        self.assertEqual(
+            context.dest_path(os.path.join(self.content, "blog", "post.md")),
+            os.path.join(self.root, "docs", "blog", "post.html"),
+        )
+
+    def test_dest_path_single_page(self):
+        source = os.path.join(self.content, "index.md")
+        context = BuildContext(source, self.template, os.path.join(self.root, "out", "index.md"))
+        self.assertEqual(context.dest_path(source), os.path.join(self.root, "out", "index.html"))
+
+    def test_template_rewritten_once(self):
+        context = BuildContext(self.content, self.template, os.path.join(self.root, "docs"), "/site/")
+        self.assertEqual(context.template.chunks[0], '<a href="/site/">')
+
+    def test_pages_use_context(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        context = BuildContext(self.content, self.template, os.path.join(self.root, "docs"), "/site/", manifest)
+        # The template file is not read again for each page
+        self.write("template.html", "Changed {{ Title }} {{ Content }}")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, os.path.join(self.root, "docs"), "/site/", context=context)
+        self.assertEqual(self.read("docs/blog/post.html"), '<a href="/site/">Post</a><div><h1>Post</h1><p>Text</p></div>')
+        self.assertIn('href="/site/blog/post"', self.read("docs/index.html"))
+        self.assertEqual(len(manifest.pages), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
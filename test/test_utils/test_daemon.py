@@ -0,0 +1,102 @@
+import io
+import json
+import os
+import threading
+import time
+import unittest
+
+from utils.daemon import BuildDaemon
+from utils.daemon_client import send_request
+from test_utils import TempDirTestCase
+
+
+class TestBuildDaemon(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.root, "content", "blog"))
+        os.makedirs(os.path.join(self.root, "static"))
+        self.write("static/index.css", "body {}")
+        self.write("template.html", "{{ Title }}{{ Content }}")
+        self.write("content/index.md", "# Home\n\n[Blog](/blog/post)")
+        self.write("content/blog/post.md", "# Post\n\nText")
+
+        self.socket_path = os.path.join(self.root, "daemon.sock")
+        self.daemon = BuildDaemon(
+            self.socket_path,
+            os.path.join(self.root, "content"),
+            os.path.join(self.root, "static"),
+            os.path.join(self.root, "template.html"),
+            os.path.join(self.root, "docs"),
+            os.path.join(self.root, "manifest.json"),
+        )
+        self.thread = threading.Thread(target=self.daemon.serve, daemon=True)
+        self.thread.start()
+        while not os.path.exists(self.socket_path):
+            time.sleep(0.01)
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            send_request(self.socket_path, {"command": "stop"}, io.StringIO())
+            self.thread.join(5)
+        super().tearDown()
+
+    def build(self, **request):
+        out = io.StringIO()
+        status = send_request(self.socket_path, {"command": "build", **request}, out)
+        return status, out.getvalue()
+
+    def test_build_streams_output(self):
+        status, output = self.build(basepath="/site/")
+        self.assertEqual(status["status"], "ok")
+        self.assertEqual(output.count("Generating page"), 2)
+        self.assertEqual(self.read("docs/index.html"), 'Home<div><h1>Home</h1><p><a href="/site/blog/post">Blog</a></p></div>')
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_incremental_builds(self):
+        self.build()
+        status, output = self.build()
+        self.assertEqual(status["status"], "ok")
+        self.assertNotIn("Generating page", output)
+
+        self.write("content/blog/post.md", "# Post\n\nChanged")
+        _, output = self.build()
+        self.assertEqual(output.count("Generating page"), 1)
+        self.assertIn("Changed", self.read("docs/blog/post.html"))
+
+        _, output = self.build(incremental=False)
+        self.assertEqual(output.count("Generating page"), 2)
+
+    def test_full_build_does_not_record_static_files(self):
+        css = os.path.join(self.root, "docs", "index.css")
+        self.build(incremental=False)
+        with open(os.path.join(self.root, "manifest.json")) as f:
+            self.assertNotIn(css, json.load(f)["graph"]["outputs"])
+
+        self.build()
+        with open(os.path.join(self.root, "manifest.json")) as f:
+            self.assertIn(css, json.load(f)["graph"]["outputs"])
+
+    def test_build_error(self):
+        self.write("content/blog/post.md", "No title")
+        status, _ = self.build()
+        self.assertEqual(status["status"], "error")
+        self.assertIn("missing header", status["message"])
+        # The daemon keeps serving after a failed build
+        self.write("content/blog/post.md", "# Fixed")
+        self.assertEqual(self.build()[0]["status"], "ok")
+
+    def test_invalid_command(self):
+        status = send_request(self.socket_path, {"command": "explode"}, io.StringIO())
+        self.assertEqual(status["status"], "error")
+
+    def test_stop(self):
+        send_request(self.socket_path, {"command": "stop"}, io.StringIO())
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+        with self.assertRaises(Exception):
+            send_request(self.socket_path, {"command": "build"}, io.StringIO())
+
+
+if __name__ == "__main__":
+    unittest.main()
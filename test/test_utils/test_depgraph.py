@@ -0,0 +1,103 @@
+import os
+import unittest
+
+from utils.depgraph import DependencyGraph
+from utils.manifest import hash_file
+from test_utils import TempDirTestCase
+
+
+class TestDependencyGraph(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hashed = []
+        self.graph = DependencyGraph(self.hasher)
+        self.template = self.write("template.html", "{{ Content }}")
+        self.a = self.write("a.md", "# A")
+        self.b = self.write("b.md", "# B")
+        self.graph.record("a.html", [self.a, self.template])
+        self.graph.record("b.html", [self.b, self.template])
+
+    def hasher(self, path):
+        self.hashed.append(path)
+        return hash_file(path)
+
+    def settle(self, *paths):
+        # Moves the mtimes out of the racy window so the recorded signatures are trusted
+        for path in paths:
+            os.utime(path, ns=(0, 1_000_000_000))
+        for output, dependencies in list(self.graph.outputs.items()):
+            self.graph.record(output, dependencies)
+
+    def test_dependencies_and_dependents(self):
+        self.assertEqual(self.graph.dependencies("a.html"), [self.a, self.template])
+        self.assertEqual(self.graph.dependents(self.template), {"a.html", "b.html"})
+        self.assertEqual(self.graph.dependents(self.a), {"a.html"})
+        self.assertEqual(self.graph.dependencies("missing.html"), [])
+
+    def test_affected(self):
+        self.assertEqual(self.graph.affected([self.a]), {"a.html"})
+        self.assertEqual(self.graph.affected([self.template]), {"a.html", "b.html"})
+        self.assertEqual(self.graph.affected(["unrelated.md"]), set())
+
+    def test_changed_inputs(self):
+        self.assertEqual(self.graph.changed_inputs(), set())
+        self.write("b.md", "# Changed B")
+        self.assertEqual(self.graph.changed_inputs(), {self.b})
+        os.remove(self.a)
+        self.assertEqual(self.graph.stale_outputs(), {"a.html", "b.html"})
+
+    def test_template_change_stales_every_page(self):
+        self.write("template.html", "<main>{{ Content }}</main>")
+        self.assertTrue(self.graph.is_stale("a.html"))
+        self.graph.record("a.html", [self.a, self.template])
+        self.assertFalse(self.graph.is_stale("a.html"))
+        self.assertTrue(self.graph.is_stale("b.html"))
+        self.assertTrue(self.graph.is_stale("unknown.html"))
+
+    def test_unchanged_signature_not_hashed(self):
+        self.settle(self.a, self.b, self.template)
+        self.hashed.clear()
+        self.assertEqual(self.graph.changed_inputs(), set())
+        self.assertEqual(self.hashed, [])
+
+        # Touched without a content change is hashed once, then trusted again
+        os.utime(self.a, ns=(0, 2_000_000_000))
+        self.assertEqual(self.graph.changed_inputs(), set())
+        self.assertEqual(self.hashed, [self.a])
+        self.assertEqual(self.graph.changed_inputs(), set())
+        self.assertEqual(self.hashed, [self.a])
+
+    def test_snapshot_taken_before_read(self):
+        self.settle(self.a, self.b, self.template)
+        self.graph.snapshot(self.template)
+        self.write("template.html", "<main>{{ Content }}</main>")
+        os.utime(self.template, ns=(0, 2_000_000_000))
+        # Recorded with the state it had when snapshotted, not the edited one
+        self.graph.record("a.html", [self.a, self.template])
+        graph = DependencyGraph.from_dict(self.graph.to_dict(), hash_file)
+        self.assertTrue(graph.is_stale("a.html"))
+
+    def test_recently_modified_inputs_hashed(self):
+        self.hashed.clear()
+        self.graph.changed_inputs()
+        self.assertEqual(sorted(self.hashed), sorted([self.a, self.b, self.template]))
+
+    def test_remove(self):
+        self.assertTrue(self.graph.remove("a.html"))
+        self.assertFalse(self.graph.remove("a.html"))
+        self.assertNotIn(self.a, self.graph.inputs)
+        self.assertIn(self.template, self.graph.inputs)
+        self.assertEqual(self.graph.dependents(self.template), {"b.html"})
+
+    def test_round_trip(self):
+        graph = DependencyGraph.from_dict(self.graph.to_dict(), hash_file)
+        self.assertEqual(graph.dependents(self.template), {"a.html", "b.html"})
+        self.assertEqual(graph.inputs, self.graph.inputs)
+
+    def test_invalid_data(self):
+        for data in (None, [], {"outputs": []}, {"outputs": {"a.html": ["a.md"]}, "inputs": {}}):
+            self.assertEqual(DependencyGraph.from_dict(data, hash_file).outputs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
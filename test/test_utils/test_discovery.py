@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from utils.discovery import DirectoryIndex, find_markdown_files, page_dest_path, scan_directory
+
+
+class TestDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        for name in ("index.md", "notes.txt", "blog/cmd/index.md", "blog/amd.md", "blog/images/a.png"):
+            self.write(name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.content, name)
+
+    def write(self, name):
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        with open(self.path(name), "w") as f:
+            f.write("# Page")
+
+    def settle(self, *names):
+        # Moves the mtimes out of the racy window so the index trusts its records
+        for name in names:
+            os.utime(self.path(name), ns=(0, 1_000_000_000))
+
+    def test_scan_directory(self):
+        self.assertEqual(scan_directory(self.content), (["blog"], ["index.md"]))
+        self.assertEqual(scan_directory(self.path("blog")), (["cmd", "images"], ["amd.md"]))
+
+    def test_find_markdown_files(self):
+        self.assertEqual(find_markdown_files(self.content), [
+            self.path("blog/amd.md"),
+            self.path("blog/cmd/index.md"),
+            self.path("index.md"),
+        ])
+        self.assertEqual(find_markdown_files(self.path("index.md")), [self.path("index.md")])
+
+    def test_page_dest_path(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        self.assertEqual(page_dest_path(self.path("blog/cmd/index.md"), self.content, dest), os.path.join(dest, "blog", "cmd", "index.html"))
+        self.assertEqual(page_dest_path(self.path("blog/amd.md"), self.content, dest), os.path.join(dest, "blog", "amd.html"))
+        self.assertEqual(page_dest_path(self.path("index.md"), self.path("index.md"), os.path.join(dest, "page.md")), os.path.join(dest, "page.html"))
+
+    def test_index_reuses_unchanged_directories(self):
+        index = DirectoryIndex()
+        expected = find_markdown_files(self.content)
+        self.assertEqual(find_markdown_files(self.content, index), expected)
+
+        # A record is only trusted once the directory is older than the racy window
+        self.settle("blog")
+        index.list_directory(self.path("blog"))
+        index.directories[self.path("blog")]["pages"] = ["cached.md"]
+        self.assertIn(self.path("blog/cached.md"), find_markdown_files(self.content, index))
+
+        self.write("blog/new.md")
+        found = find_markdown_files(self.content, index)
+        self.assertIn(self.path("blog/new.md"), found)
+        self.assertNotIn(self.path("blog/cached.md"), found)
+
+    def test_recent_directories_listed_again(self):
+        index = DirectoryIndex()
+        index.list_directory(self.content)
+        index.directories[self.content]["pages"] = ["cached.md"]
+        self.assertEqual(index.list_directory(self.content), (["blog"], ["index.md"]))
+
+    def test_save_and_load(self):
+        index_path = os.path.join(self.tmp.name, "index.json")
+        self.settle("blog", "blog/cmd", "blog/images", "")
+        index = DirectoryIndex.load(index_path)
+        self.assertEqual(index.directories, {})
+        find_markdown_files(self.content, index)
+        index.directories["/removed"] = {"mtime_ns": 1, "dirs": [], "pages": []}
+        index.save()
+
+        loaded = DirectoryIndex.load(index_path)
+        self.assertEqual(len(loaded.directories), 4)
+        self.assertNotIn("/removed", loaded.directories)
+        self.assertEqual(loaded.directories[self.path("blog")]["pages"], ["amd.md"])
+        self.assertEqual(find_markdown_files(self.content, loaded), find_markdown_files(self.content))
+
+    def test_load_invalid_index(self):
+        index_path = os.path.join(self.tmp.name, "index.json")
+        with open(index_path, "w") as f:
+            f.write("not json")
+        self.assertEqual(DirectoryIndex.load(index_path).directories, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
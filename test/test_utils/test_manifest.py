@@ -0,0 +1,143 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from utils import site_gen
+from utils.manifest import BuildManifest, FileHashCache, hash_file
+from utils.site_gen import generate_pages_recursive
+from test_utils import TempDirTestCase
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.index = self.write("content/index.md", "# Home\n\nWelcome")
+        self.post = self.write("content/blog/post.md", "# Post\n\nA post")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+
+    def build(self, basepath="/"):
+        manifest = BuildManifest.load(self.manifest_path)
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, basepath, manifest)
+        removed = manifest.prune()
+        manifest.save()
+        return manifest, removed
+
+    def output_mtimes(self):
+        return {
+            name: os.stat(os.path.join(self.dest, name)).st_mtime_ns
+            for name in ("index.html", "blog/post.html")
+        }
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.index), hash_file(self.index))
+        self.assertNotEqual(hash_file(self.index), hash_file(self.post))
+
+    def test_file_hash_cache(self):
+        cache = FileHashCache()
+        stat = os.stat(self.index)
+        mtime_ns = stat.st_mtime_ns - 10_000_000_000
+        os.utime(self.index, ns=(stat.st_atime_ns, mtime_ns))
+        stat = os.stat(self.index)
+        digest = cache.get(self.index)
+        self.assertEqual(digest, hash_file(self.index))
+        # An unchanged size and mtime reuse the stored hash without reading the file
+        with open(self.index, "w") as f:
+            f.write("# Home\n\nWELCOME")
+        os.utime(self.index, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(cache.get(self.index), digest)
+        os.utime(self.index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertEqual(cache.get(self.index), hash_file(self.index))
+
+    def test_file_hash_cache_rehashes_recent_files(self):
+        cache = FileHashCache()
+        digest = cache.get(self.index)
+        stat = os.stat(self.index)
+        # Rewritten within the same mtime tick, the file was too recent to be trusted
+        with open(self.index, "w") as f:
+            f.write("# Home\n\nWELCOME")
+        os.utime(self.index, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertNotEqual(cache.get(self.index), digest)
+        self.assertEqual(cache.get(self.index), hash_file(self.index))
+
+    def test_records_pages(self):
+        manifest, _ = self.build()
+        entry = manifest.pages[self.index]
+        self.assertEqual(entry["output"], os.path.join(self.dest, "index.html"))
+        self.assertEqual(entry["basepath"], "/")
+        output = entry["output"]
+        self.assertEqual(manifest.graph.dependencies(output), [self.index, self.template])
+        self.assertEqual(manifest.graph.inputs[self.index]["hash"], hash_file(self.index))
+        self.assertEqual(manifest.graph.inputs[self.template]["hash"], hash_file(self.template))
+
+    def test_unchanged_pages_skipped(self):
+        self.build()
+        os.utime(os.path.join(self.dest, "index.html"), ns=(0, 0))
+        os.utime(os.path.join(self.dest, "blog/post.html"), ns=(0, 0))
+        self.write("content/blog/post.md", "# Post\n\nAn edited post")
+        self.build()
+        mtimes = self.output_mtimes()
+        self.assertEqual(mtimes["index.html"], 0)
+        self.assertNotEqual(mtimes["blog/post.html"], 0)
+
+    def test_template_and_basepath_changes_rebuild(self):
+        self.build()
+        for name in ("index.html", "blog/post.html"):
+            os.utime(os.path.join(self.dest, name), ns=(0, 0))
+        self.build(basepath="/site/")
+        self.assertNotIn(0, self.output_mtimes().values())
+
+        for name in ("index.html", "blog/post.html"):
+            os.utime(os.path.join(self.dest, name), ns=(0, 0))
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build(basepath="/site/")
+        self.assertNotIn(0, self.output_mtimes().values())
+
+    def test_template_edited_during_build(self):
+        for path in (self.template, self.index, self.post):
+            os.utime(path, ns=(0, 1_000_000_000))
+
+        generate_page = site_gen.generate_page
+        def edit_template_after_first_page(*args, **kwargs):
+            generate_page(*args, **kwargs)
+            if os.stat(self.template).st_mtime_ns == 1_000_000_000:
+                self.write("template.html", "<main>{{ Content }}</main>")
+                os.utime(self.template, ns=(0, 2_000_000_000))
+        site_gen.generate_page = edit_template_after_first_page
+        try:
+            self.build()
+        finally:
+            site_gen.generate_page = generate_page
+
+        # Both pages were rendered with the template as it was loaded, so both are stale
+        self.build()
+        self.assertTrue(self.read("docs/index.html").startswith("<main>"))
+        self.assertTrue(self.read("docs/blog/post.html").startswith("<main>"))
+
+    def test_missing_output_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_deleted_source_pruned(self):
+        self.build()
+        os.remove(self.post)
+        manifest, removed = self.build()
+        self.assertEqual(removed, [os.path.join(self.dest, "blog/post.html")])
+        self.assertNotIn(self.post, manifest.pages)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_load_invalid_manifest(self):
+        self.write("manifest.json", "not json")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
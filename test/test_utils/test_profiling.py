@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from utils.profiling import BuildProfiler, active_profiler, count_spans, set_active_profiler, stage
+from utils.site_gen import generate_pages_parallel, generate_pages_recursive
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_stage_self_time(self):
+        profiler = BuildProfiler()
+        with profiler.page("page.md"):
+            with profiler.stage("outer"):
+                with profiler.stage("inner"):
+                    sum(range(100000))
+        outer_wall, _, outer_calls = profiler.stages["outer"]
+        inner_wall, _, inner_calls = profiler.stages["inner"]
+        self.assertEqual((outer_calls, inner_calls), (1, 1))
+        self.assertLess(outer_wall, inner_wall)
+        self.assertLessEqual(outer_wall + inner_wall, profiler.pages[0]["wall"])
+
+    def test_trace_events(self):
+        profiler = BuildProfiler()
+        with profiler.page("dir/page.md"):
+            profiler.add_spans(3)
+            with profiler.stage("outer"):
+                with profiler.stage("inner"):
+                    pass
+        self.assertEqual([event["name"] for event in profiler.events], ["outer", "page.md"])
+        self.assertEqual(profiler.events[1]["args"], {"path": "dir/page.md", "spans": 3})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_trace(path)
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)["traceEvents"]), 2)
+
+    def test_export_and_merge(self):
+        worker = BuildProfiler()
+        with worker.page("a.md"):
+            with worker.stage("read"):
+                pass
+        parent = BuildProfiler()
+        with parent.page("b.md"):
+            with parent.stage("read"):
+                pass
+        parent.merge(worker.export())
+        self.assertEqual(worker.pages, [])
+        self.assertEqual(parent.stages["read"][2], 2)
+        self.assertEqual(sorted(page["path"] for page in parent.pages), ["a.md", "b.md"])
+
+    def test_summary(self):
+        profiler = BuildProfiler()
+        for name in ("fast.md", "slow.md"):
+            with profiler.page(name):
+                with profiler.stage("read"):
+                    if name == "slow.md":
+                        sum(range(200000))
+        summary = profiler.summary(top=1)
+        self.assertIn("2 pages", summary)
+        self.assertIn("read", summary)
+        self.assertIn("slow.md", summary)
+        self.assertNotIn("fast.md", summary)
+
+    def test_stage_without_profiler(self):
+        self.assertIsNone(active_profiler())
+        with stage("read"):
+            pass
+
+    def test_count_spans(self):
+        profiler = BuildProfiler()
+        set_active_profiler(profiler)
+        try:
+            count_spans(2)
+            with profiler.page("page.md"):
+                count_spans(3)
+                count_spans(1)
+        finally:
+            set_active_profiler(None)
+        count_spans(5)
+        self.assertEqual(profiler.pages[0]["spans"], 4)
+
+
+
+class TestProfiledBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(self.content)
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write("{{ Title }}{{ Content }}")
+        for name in ("a", "b"):
+            with open(os.path.join(self.content, f"{name}.md"), "w") as f:
+                f.write(f"# {name}\n\nSome **bold** text\n\n- a\n- list")
+
+    def tearDown(self):
+        set_active_profiler(None)
+        self.tmp.cleanup()
+
+    def build(self, build_func, *args):
+        profiler = BuildProfiler()
+        set_active_profiler(profiler)
+        with redirect_stdout(io.StringIO()):
+            build_func(self.content, self.template, os.path.join(self.tmp.name, "out"), "/", *args)
+        set_active_profiler(None)
+        return profiler
+
+    def test_recursive(self):
+        profiler = self.build(generate_pages_recursive)
+        self.assertEqual(len(profiler.pages), 2)
+        self.assertEqual(profiler.pages[0]["spans"], 6)
+        for name in ("read", "split_blocks", "block_type", "render", "inline", "write"):
+            self.assertIn(name, profiler.stages)
+
+    def test_parallel(self):
+        profiler = self.build(generate_pages_parallel, 2)
+        self.assertEqual(sorted(os.path.basename(page["path"]) for page in profiler.pages), ["a.md", "b.md"])
+        self.assertEqual(profiler.stages["read"][2], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,13 @@ import unittest
 from utils.regex import (
     extract_markdown_images, 
     extract_markdown_links, 
+    iter_markdown_images,
+    iter_markdown_links,
     is_block_heading, 
     is_block_code, 
     get_heading,
+    classify_block_start,
+    remove_ordered_list_prefix,
     extract_title,
 )
 
@@ -26,6 +30,19 @@ class TestExtract(unittest.TestCase):
             "This is text with an ![image]https://i.imgur.com/zjjcJKZ.png)")
         self.assertEqual(len(matches), 0)
 
+    def test_iter_markdown_images_spans(self):
+        text = "a ![image](/i.png) b"
+        matches = list(iter_markdown_images(text))
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].span(), (2, 18))
+        self.assertEqual(matches[0].groups(), ("image", "/i.png"))
+
+    def test_iter_markdown_links_skips_images(self):
+        text = "![image](/i.png) and [link](/l)"
+        matches = list(iter_markdown_links(text))
+        self.assertEqual([m.groups() for m in matches], [("link", "/l")])
+        self.assertEqual(text[matches[0].start():matches[0].end()], "[link](/l)")
+
     def test_extract_markdown_link(self):
         matches = extract_markdown_links(
             "This is text with a link [to boot dev](https://www.boot.dev)"
@@ -100,6 +117,20 @@ class TestIsBlockCode(unittest.TestCase):
         result = is_block_code(block)
         self.assertEqual(result, False)
 
+class TestClassifyBlockStart(unittest.TestCase):
+    def test_heading_level(self):
+        self.assertEqual(classify_block_start("### Heading 3"), ("heading", 3))
+        self.assertEqual(classify_block_start("###### Heading 6"), ("heading", 6))
+
+    def test_code(self):
+        self.assertEqual(classify_block_start("```code\nmore```"), ("code", 0))
+
+    def test_neither(self):
+        self.assertEqual(classify_block_start("####### Heading 7"), (None, 0))
+        self.assertEqual(classify_block_start("#Heading"), (None, 0))
+        self.assertEqual(classify_block_start("```code``"), (None, 0))
+        self.assertEqual(classify_block_start("plain text"), (None, 0))
+
 class TestHeadingNumber(unittest.TestCase):
     def test_heading_1(self):
         block = "# Heading 1"
@@ -126,6 +157,13 @@ class TestHeadingNumber(unittest.TestCase):
         heading_num = get_heading(block)
         self.assertEqual(heading_num, None)
 
+class TestRemoveOrderedListPrefix(unittest.TestCase):
+    def test_remove_prefix(self):
+        self.assertEqual(remove_ordered_list_prefix("12. item 1. here"), "item 1. here")
+
+    def test_no_prefix(self):
+        self.assertEqual(remove_ordered_list_prefix("item 1. here"), "item 1. here")
+
 class TestExtractTitle(unittest.TestCase):
     def test_has_title(self):
         block = """
@@ -164,4 +202,17 @@ has multiple lines
             extract_title(block)
         
         exception = context.exception
-        self.assertEqual(str(exception), "Markdown file is missing header!")
\ No newline at end of file
+        self.assertEqual(str(exception), "Markdown file is missing header!")
+
+    def test_title_stripped(self):
+        title = extract_title("intro\n   # Spaced Title  \r\n\n# Second")
+        self.assertEqual(title, "Spaced Title")
+
+    def test_hash_without_title(self):
+        with self.assertRaises(Exception):
+            extract_title("#   \n#Title\n## Sub")
+
+    def test_title_from_lines(self):
+        lines = iter(["intro\n", "# From Lines\n", "unread\n"])
+        self.assertEqual(extract_title(lines), "From Lines")
+        self.assertEqual(next(lines), "unread\n")
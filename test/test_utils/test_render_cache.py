@@ -0,0 +1,110 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from htmlnode import LeafNode
+from utils import convert
+from utils.convert import markdown_to_html_node
+from utils.render_cache import RenderCache, make_key
+
+
+class TestMakeKey(unittest.TestCase):
+    def test_stable(self):
+        self.assertEqual(make_key("1", "block"), make_key("1", "block"))
+
+    def test_parts_are_separated(self):
+        self.assertNotEqual(make_key("1", "2block"), make_key("12", "block"))
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_lru(self):
+        cache = RenderCache(max_entries=2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+        self.assertEqual(cache.get("a"), "<p>a</p>")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "<p>c</p>")
+
+    def test_disk_tier(self):
+        cache = RenderCache(self.cache_dir)
+        cache.put("abcd", "<p>a</p>")
+        other = RenderCache(self.cache_dir)
+        self.assertEqual(other.get("abcd"), "<p>a</p>")
+        self.assertEqual(other.hits, 1)
+        self.assertIsNone(other.get("ffff"))
+        self.assertEqual(other.misses, 1)
+
+    def test_disk_eviction(self):
+        cache = RenderCache(self.cache_dir, max_disk_bytes=250)
+        for i in range(5):
+            key = f"{i:02d}" * 4
+            cache.put(key, "x" * 100)
+            os.utime(cache._disk_path(key), (i, i))
+        sizes = [size for _, size, _ in cache._disk_entries()]
+        self.assertLessEqual(sum(sizes), 250)
+        cache.clear_memory()
+        self.assertIsNone(cache.get("00000000"))
+        self.assertEqual(cache.get("04040404"), "x" * 100)
+
+    def test_pickle_drops_memory(self):
+        cache = RenderCache(self.cache_dir, max_entries=3)
+        cache.put("abcd", "<p>a</p>")
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copy.max_entries, 3)
+        self.assertEqual(len(copy._memory), 0)
+        self.assertEqual(copy.get("abcd"), "<p>a</p>")
+
+
+class TestMarkdownToHtmlNodeCache(unittest.TestCase):
+    md = "# Title\n\nSome **bold** text\n\n- a\n- b"
+
+    def test_same_html(self):
+        cache = RenderCache()
+        expected = markdown_to_html_node(self.md).to_html()
+        self.assertEqual(markdown_to_html_node(self.md, cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(self.md, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, 3)
+
+    def test_hits_skip_conversion(self):
+        cache = RenderCache()
+        markdown_to_html_node(self.md, cache)
+        original = convert.block_to_html_node
+        convert.block_to_html_node = None
+        try:
+            node = markdown_to_html_node(self.md, cache)
+        finally:
+            convert.block_to_html_node = original
+        self.assertTrue(all(isinstance(child, LeafNode) for child in node.children))
+
+    def test_version_in_key(self):
+        cache = RenderCache()
+        markdown_to_html_node(self.md, cache)
+        original = convert.CONVERTER_VERSION
+        convert.CONVERTER_VERSION = "test"
+        try:
+            markdown_to_html_node(self.md, cache)
+        finally:
+            convert.CONVERTER_VERSION = original
+        self.assertEqual(cache.misses, 6)
+
+    def test_basepath_in_key(self):
+        cache = RenderCache()
+        md = "[home](/index)"
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), '<div><p><a href="/index">home</a></p></div>')
+        self.assertEqual(markdown_to_html_node(md, cache, "/site/").to_html(), '<div><p><a href="/site/index">home</a></p></div>')
+        self.assertEqual(cache.misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from utils import site_gen
+from utils.profiling import BuildProfiler, set_active_profiler
+from utils.site_gen import collect_pages, generate_pages_parallel, generate_pages_recursive
+from test_utils import TempDirTestCase
+
+
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        os.makedirs(os.path.join(self.content, "blog", "b"))
+        os.makedirs(os.path.join(self.content, "blog", "a"))
+        self.template = self.write("template.html", '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.write("content/index.md", "# Home\n\n[Blog](/blog/a)")
+        self.write("content/blog/a/index.md", "# A\n\nSome **bold** text")
+        self.write("content/blog/b/index.md", "# B\n\n- a\n- list")
+
+    def test_collect_pages(self):
+        pages = collect_pages(self.content, "out")
+        self.assertEqual(
+            pages,
+            [
+                (f"{self.content}/blog/a/index.md", "out/blog/a/index.html"),
+                (f"{self.content}/blog/b/index.md", "out/blog/b/index.html"),
+                (f"{self.content}/index.md", "out/index.html"),
+            ],
+        )
+
+    def test_paths_containing_md(self):
+        os.makedirs(os.path.join(self.content, "cmd"))
+        self.write("content/cmd/index.md", "# Commands")
+        self.write("content/cmd/notes.txt", "Not a page")
+        out = os.path.join(self.root, "mdout")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, out, "/")
+        self.assertEqual(sorted(self.read_tree(out)), ["blog/a/index.html", "blog/b/index.html", "cmd/index.html", "index.html"])
+        self.assertIn((f"{self.content}/cmd/index.md", f"{out}/cmd/index.html"), collect_pages(self.content, out))
+
+    def test_parallel_matches_sequential(self):
+        sequential = os.path.join(self.root, "sequential")
+        parallel = os.path.join(self.root, "parallel")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, sequential, "/site/")
+            generate_pages_parallel(self.content, self.template, parallel, "/site/", jobs=2)
+        self.assertEqual(self.read_tree(sequential), self.read_tree(parallel))
+        self.assertEqual(len(self.read_tree(parallel)), 3)
+
+    def test_parallel_error_names_file(self):
+        bad = self.write("content/blog/b/index.md", "No title here")
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(Exception) as ctx:
+                generate_pages_parallel(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=2)
+        self.assertIn(bad, str(ctx.exception))
+
+    def test_streamed_pages_match(self):
+        self.write("content/blog/a/index.md", "Intro\n\n# A\n\n```\ncode\n\nmore\n```\n\n![img](/a.png) and [link](/b)")
+        whole = os.path.join(self.root, "whole")
+        streamed = os.path.join(self.root, "streamed")
+        threshold = site_gen.STREAM_THRESHOLD_BYTES
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, whole, "/site/")
+            site_gen.STREAM_THRESHOLD_BYTES = 0
+            try:
+                generate_pages_recursive(self.content, self.template, streamed, "/site/")
+            finally:
+                site_gen.STREAM_THRESHOLD_BYTES = threshold
+        self.assertEqual(self.read_tree(whole), self.read_tree(streamed))
+        self.assertIn('src="/site/a.png"', self.read_tree(streamed)["blog/a/index.html"])
+
+    def test_profiled_pages_match(self):
+        # Profiling only times the stages and counts the spans, the pages are the same
+        fast = os.path.join(self.root, "fast")
+        profiled = os.path.join(self.root, "profiled")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, fast, "/site/")
+            set_active_profiler(BuildProfiler())
+            try:
+                generate_pages_recursive(self.content, self.template, profiled, "/site/")
+            finally:
+                set_active_profiler(None)
+        self.assertEqual(self.read_tree(fast), self.read_tree(profiled))
+
+
+if __name__ == "__main__":
+    unittest.main()
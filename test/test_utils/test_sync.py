@@ -0,0 +1,98 @@
+import os
+import unittest
+
+from utils.depgraph import DependencyGraph
+from utils.manifest import hash_file
+from utils.sync import is_file_unchanged, place_file, sync_directory
+from test_utils import TempDirTestCase
+
+
+class TestSyncDirectory(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.source, "images"))
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+
+    def test_initial_sync(self):
+        copied, removed = sync_directory(self.source, self.dest)
+        self.assertEqual(copied, [self.path("docs/images/a.png"), self.path("docs/index.css")])
+        self.assertEqual(removed, [])
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_unchanged_files_skipped(self):
+        sync_directory(self.source, self.dest)
+        self.assertEqual(sync_directory(self.source, self.dest), ([], []))
+
+    def test_changed_file_copied(self):
+        sync_directory(self.source, self.dest)
+        self.write("static/index.css", "body { color: red; }")
+        copied, _ = sync_directory(self.source, self.dest)
+        self.assertEqual(copied, [self.path("docs/index.css")])
+        self.assertEqual(self.read("docs/index.css"), "body { color: red; }")
+
+    def test_verify_hash(self):
+        sync_directory(self.source, self.dest)
+        stat = os.stat(self.path("docs/index.css"))
+        self.write("docs/index.css", "bodx {}")
+        os.utime(self.path("docs/index.css"), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(sync_directory(self.source, self.dest), ([], []))
+        copied, _ = sync_directory(self.source, self.dest, verify_hash=True)
+        self.assertEqual(copied, [self.path("docs/index.css")])
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_graph_records_files(self):
+        graph = DependencyGraph(hash_file)
+        sync_directory(self.source, self.dest, graph=graph)
+        self.assertEqual(graph.dependencies(self.path("docs/index.css")), [self.path("static/index.css")])
+
+        os.remove(self.path("static/images/a.png"))
+        _, removed = sync_directory(self.source, self.dest, graph=graph)
+        self.assertEqual(removed, [self.path("docs/images/a.png")])
+        self.assertEqual(graph.dependencies(self.path("docs/images/a.png")), [])
+
+    def test_graph_verify_hash(self):
+        graph = DependencyGraph(hash_file)
+        sync_directory(self.source, self.dest, graph=graph)
+        stat = os.stat(self.path("docs/index.css"))
+        self.write("docs/index.css", "bodx {}")
+        os.utime(self.path("docs/index.css"), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        # The copy is still checked against the recorded hash of its source
+        copied, _ = sync_directory(self.source, self.dest, verify_hash=True, graph=graph)
+        self.assertEqual(copied, [self.path("docs/index.css")])
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_orphans_removed_and_kept(self):
+        sync_directory(self.source, self.dest)
+        self.write("docs/old/stale.png", "old")
+        self.write("docs/index.html", "<html></html>")
+        _, removed = sync_directory(self.source, self.dest, keep={self.path("docs/index.html")})
+        self.assertEqual(removed, [self.path("docs/old/stale.png")])
+        self.assertFalse(os.path.exists(self.path("docs/old")))
+        self.assertTrue(os.path.exists(self.path("docs/index.html")))
+
+    def test_hardlink(self):
+        sync_directory(self.source, self.dest, link_mode="hardlink")
+        self.assertTrue(os.path.samefile(self.path("static/index.css"), self.path("docs/index.css")))
+        self.assertTrue(is_file_unchanged(self.path("static/index.css"), self.path("docs/index.css")))
+
+    def test_copy_replaces_hardlink(self):
+        sync_directory(self.source, self.dest, link_mode="hardlink")
+        place_file(self.path("static/index.css"), self.path("docs/index.css"))
+        self.assertFalse(os.path.samefile(self.path("static/index.css"), self.path("docs/index.css")))
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_reflink_falls_back_to_copy(self):
+        sync_directory(self.source, self.dest, link_mode="reflink")
+        self.assertEqual(self.read("docs/images/a.png"), "png")
+        self.assertTrue(is_file_unchanged(self.path("static/images/a.png"), self.path("docs/images/a.png")))
+
+    def test_invalid_link_mode(self):
+        with self.assertRaises(Exception):
+            place_file(self.path("static/index.css"), self.path("docs/index.css"), "symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from utils.template import Template, compile_template, load_template, rewrite_basepath
+
+
+class TestCompileTemplate(unittest.TestCase):
+    def test_chunks_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><p>{{Content}}</p>")
+        self.assertEqual(template.chunks, ["<title>", "</title><p>", "</p>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_no_placeholders(self):
+        template = compile_template("<p>static</p>")
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        html = template.render({"Title": "Home", "Content": "<p>hi</p>"})
+        self.assertEqual(html, "<title>Home</title><p>hi</p>")
+
+    def test_render_named_placeholders(self):
+        template = compile_template("{{ Title }} by {{ Author }} on {{ Date }}, {{ Author }}")
+        self.assertEqual(template.placeholders, {"Title", "Author", "Date"})
+        html = template.render({"Title": "Post", "Author": "Me", "Date": "today"})
+        self.assertEqual(html, "Post by Me on today, Me")
+
+    def test_render_missing_value(self):
+        template = compile_template("{{ Title }}{{ Content }}")
+        with self.assertRaises(Exception) as ctx:
+            template.render({"Title": "Home"})
+        self.assertIn("Content", str(ctx.exception))
+
+    def test_write_streams_nodes(self):
+        template = compile_template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        fp = io.StringIO()
+        template.write(fp, {"Title": "Home", "Content": ParentNode("div", [LeafNode("p", "hi")])})
+        self.assertEqual(fp.getvalue(), "<title>Home</title><article><div><p>hi</p></div></article>")
+
+    def test_write_missing_value(self):
+        template = compile_template("{{ Title }}{{ Content }}")
+        fp = io.StringIO()
+        with self.assertRaises(Exception):
+            template.write(fp, {"Title": "Home"})
+        self.assertEqual(fp.getvalue(), "")
+
+    def test_basepath_only_rewrites_template(self):
+        template = compile_template('<link href="/index.css" /><img src="/a.png" />{{ Content }}', "/site/")
+        html = template.render({"Content": '<a href="/b">b</a>'})
+        self.assertEqual(html, '<link href="/site/index.css" /><img src="/site/a.png" /><a href="/b">b</a>')
+
+    def test_invalid_template(self):
+        with self.assertRaises(Exception):
+            Template(["a"], ["Title"])
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(rewrite_basepath('<a href="/x">', "/"), '<a href="/x">')
+        self.assertEqual(rewrite_basepath('<a href="/x"><img src="/y">', "/s/"), '<a href="/s/x"><img src="/s/y">')
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "template.html")
+        self.write("<h1>{{ Title }}</h1>", 1_000_000_000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, mtime_ns):
+        with open(self.path, "w") as f:
+            f.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_cached_until_modified(self):
+        first = load_template(self.path)
+        self.assertIs(load_template(self.path), first)
+
+        self.write("<h2>{{ Title }}</h2>", 2_000_000_000)
+        second = load_template(self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({"Title": "x"}), "<h2>x</h2>")
+
+    def test_cached_per_basepath(self):
+        self.write('<a href="/">{{ Title }}</a>', 1_000_000_000)
+        root = load_template(self.path)
+        site = load_template(self.path, "/site/")
+        self.assertEqual(root.render({"Title": "x"}), '<a href="/">x</a>')
+        self.assertEqual(site.render({"Title": "x"}), '<a href="/site/">x</a>')
+
+
+if __name__ == "__main__":
+    unittest.main()
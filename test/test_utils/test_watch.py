@@ -0,0 +1,100 @@
+import io
+import os
+import tempfile
+import unittest
+import urllib.request
+from contextlib import redirect_stdout
+
+from utils.watch import SiteWatcher, diff_snapshots, snapshot, start_server
+from test_utils import TempDirTestCase
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["b", "d"], ["c"]))
+
+    def test_snapshot_file(self):
+        with tempfile.NamedTemporaryFile() as f:
+            self.assertEqual(list(snapshot(f.name)), [f.name])
+
+
+class TestSiteWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ("content/blog", "static/images", "docs"):
+            os.makedirs(os.path.join(self.root, name))
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home\n\nWelcome")
+        self.write("content/blog/post.md", "# Post\n\nA post")
+        self.write("static/index.css", "body {}")
+        self.watcher = SiteWatcher(
+            os.path.join(self.root, "content"),
+            os.path.join(self.root, "static"),
+            os.path.join(self.root, "template.html"),
+            os.path.join(self.root, "docs"),
+        )
+        self.run_quietly(self.watcher.build)
+
+    def write(self, name, text, mtime_ns=None):
+        path = super().write(name, text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def run_quietly(self, func):
+        with redirect_stdout(io.StringIO()):
+            return func()
+
+    def poll(self):
+        return sorted(os.path.relpath(path, self.root) for path in self.run_quietly(self.watcher.poll))
+
+    def test_build(self):
+        self.assertIn("<h1>Home</h1>", self.read("docs/index.html"))
+        self.assertIn("<h1>Post</h1>", self.read("docs/blog/post.html"))
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+    def test_no_changes(self):
+        self.assertEqual(self.poll(), [])
+
+    def test_changed_page_only(self):
+        self.write("content/blog/post.md", "# Edited\n\nA post", 1)
+        self.assertEqual(self.poll(), ["docs/blog/post.html"])
+        self.assertIn("<h1>Edited</h1>", self.read("docs/blog/post.html"))
+
+    def test_added_and_removed_pages(self):
+        self.write("content/blog/new.md", "# New\n\nA new post")
+        os.remove(os.path.join(self.root, "content/index.md"))
+        self.assertEqual(self.poll(), ["docs/blog/new.html", "docs/index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs/index.html")))
+
+    def test_static_changes(self):
+        self.write("static/index.css", "body { color: red; }", 1)
+        self.write("static/images/logo.svg", "<svg/>")
+        self.assertEqual(self.poll(), ["docs/images/logo.svg", "docs/index.css"])
+        self.assertEqual(self.read("docs/index.css"), "body { color: red; }")
+
+    def test_template_change_rebuilds_all(self):
+        self.write("template.html", "<h6>{{ Title }}</h6>{{ Content }}", 1)
+        self.assertEqual(self.poll(), ["docs/blog/post.html", "docs/index.html"])
+        self.assertTrue(self.read("docs/index.html").startswith("<h6>Home</h6>"))
+
+    def test_broken_page_keeps_watching(self):
+        self.write("content/index.md", "No title", 1)
+        self.assertEqual(self.poll(), [])
+        self.write("content/index.md", "# Fixed", 2)
+        self.assertEqual(self.poll(), ["docs/index.html"])
+
+    def test_server(self):
+        server = start_server(os.path.join(self.root, "docs"), 0, "127.0.0.1")
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/index.css") as response:
+                self.assertEqual(response.read(), b"body {}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()